@@ -1,8 +1,61 @@
-# api/router.py
-from fastapi import APIRouter
+from fastapi import APIRouter, FastAPI
+from fastapi.openapi.utils import get_openapi
+from starlette.routing import Mount, Router
 from api.v1.router import router as v1_router
 
-router = APIRouter()
 
-# Mount v1 APIs
-router.include_router(v1_router, prefix="/api/v1")
\ No newline at end of file
+def _collect_routes(router: Router, prefix: str, flat: APIRouter) -> None:
+    """Re-attach mounted sub-routers under their full prefix so OpenAPI can see them"""
+    if isinstance(router, APIRouter):
+        flat.include_router(router, prefix=prefix)
+    for route in router.routes:
+        if isinstance(route, Mount) and isinstance(route.app, Router):
+            _collect_routes(route.app, prefix + route.path, flat)
+
+
+def mount_api(app: FastAPI) -> None:
+    """
+    Mount the versioned APIs on the app as sub-applications.
+
+    Mounted routers keep their own route tables instead of being flattened into
+    the app router, so the OpenAPI schema is built from a flattened copy instead.
+
+    Because the v1 routes are never rebuilt against the app, app-level settings do
+    not reach them: app.dependency_overrides, FastAPI(dependencies=...) and the app
+    default_response_class are ignored under /api/v1. Set response classes and
+    dependencies on the routers themselves, and override dependencies in tests by
+    patching the dependency providers.
+    """
+    # Mount v1 APIs
+    app.mount("/api/v1", v1_router, name="api_v1")
+
+    def openapi():
+        if app.openapi_schema is None:
+            # The schema may be built before any request, so add the configured
+            # root_path to servers here as FastAPI's /openapi.json handler would
+            if app.root_path and app.root_path_in_servers and app.root_path not in {
+                server.get("url") for server in app.servers or ()
+            }:
+                app.servers.insert(0, {"url": app.root_path})
+
+            flat = APIRouter()
+            _collect_routes(app.router, "", flat)
+            # Same arguments FastAPI.openapi passes, with the flattened routes
+            app.openapi_schema = get_openapi(
+                title=app.title,
+                version=app.version,
+                openapi_version=app.openapi_version,
+                summary=app.summary,
+                description=app.description,
+                terms_of_service=app.terms_of_service,
+                contact=app.contact,
+                license_info=app.license_info,
+                routes=flat.routes,
+                webhooks=app.webhooks.routes,
+                tags=app.openapi_tags,
+                servers=app.servers,
+                separate_input_output_schemas=app.separate_input_output_schemas,
+            )
+        return app.openapi_schema
+
+    app.openapi = openapi
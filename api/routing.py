@@ -0,0 +1,45 @@
+from typing import Dict, Optional
+from fastapi import APIRouter
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+def _route_path(scope: Scope) -> str:
+    """Path relative to the mount point this router is served under"""
+    path = scope["path"]
+    root_path = scope.get("root_path", "")
+    if root_path and path.startswith(root_path) and path != root_path and path[len(root_path)] == "/":
+        return path[len(root_path):]
+    return path
+
+
+class PrefixIndexedRouter(APIRouter):
+    """
+    Router that indexes its mounts by first path segment.
+
+    Requests whose first segment belongs to a mount are dispatched straight to
+    that mount instead of scanning every route; anything else falls back to the
+    normal linear route scan.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefix_index: Dict[str, BaseRoute] = {}
+
+    def mount(self, path: str, app: ASGIApp, name: Optional[str] = None) -> None:
+        super().mount(path, app=app, name=name)
+        self._prefix_index[path.strip("/").split("/", 1)[0]] = self.routes[-1]
+
+    async def app(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            segment = _route_path(scope).lstrip("/").split("/", 1)[0]
+            route = self._prefix_index.get(segment)
+            if route is not None:
+                match, child_scope = route.matches(scope)
+                if match == Match.FULL:
+                    if "router" not in scope:
+                        scope["router"] = self
+                    scope.update(child_scope)
+                    await route.handle(scope, receive, send)
+                    return
+        await super().app(scope, receive, send)
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from apps.dociq.routes import hello, template, extraction
 
-router = APIRouter()
+# Mounted routers do not inherit the app default_response_class, so set it here
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include hello route(s) from dociq app
 router.include_router(hello.router, prefix="", tags=["Hello"])
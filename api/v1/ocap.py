@@ -1,7 +1,9 @@
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 from apps.ocap.routes import chat, health
 
-router = APIRouter()
+# Mounted routers do not inherit the app default_response_class, so set it here
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Include chat routes
 router.include_router(chat.router, prefix="", tags=["OCAP Chat"])
@@ -1,18 +1,24 @@
 # api/v1/router.py
-from fastapi import APIRouter
+from api.routing import PrefixIndexedRouter
 from api.v1.dociq import router as dociq_router
 from api.v1.ocap import router as ocap_router
 from core.auth.routes import router as auth_router
 from core.auth.emergency_setup import router as emergency_router
 
-router = APIRouter()
+# (prefix, router, name) for every v1 domain router. Tags live on the sub-routers themselves.
+_MOUNTS = (
+    # Authentication router
+    ("/auth", auth_router, "auth"),
+    # Emergency setup router (for bcrypt compatibility issues)
+    ("/emergency", emergency_router, "emergency"),
+    # Tool-based or domain-based routers
+    ("/dociq", dociq_router, "dociq"),
+    ("/ocap", ocap_router, "ocap"),
+)
 
-# Mount authentication router
-router.include_router(auth_router, prefix="/auth", tags=["Authentication"])
+router = PrefixIndexedRouter()
 
-# Mount emergency setup router (for bcrypt compatibility issues)
-router.include_router(emergency_router, prefix="/emergency", tags=["Emergency Setup"])
-
-# Mount tool-based or domain-based routers
-router.include_router(dociq_router, prefix="/dociq")
-router.include_router(ocap_router, prefix="/ocap")
\ No newline at end of file
+# Sub-routers are mounted (not included) so their routes are not copied onto this router,
+# and requests are dispatched to the matching mount by its first path segment
+for prefix, sub_router, name in _MOUNTS:
+    router.mount(prefix, sub_router, name=name)
@@ -1 +1,27 @@
+# Package-level shortcuts are resolved lazily (PEP 562) so importing apps.dociq
+# does not pull in redis.asyncio or the database engine until they are used
+_LAZY = {
+    "redis_client": ("apps.dociq.redis_client", "redis_client"),
+    "init_redis_connection": ("apps.dociq.redis_client", "init_redis_connection"),
+    "close_redis_connection": ("apps.dociq.redis_client", "close_redis_connection"),
+    "is_redis_available": ("apps.dociq.redis_client", "is_redis_available"),
+    "engine": ("apps.dociq.db", "engine"),
+    "AsyncSessionLocal": ("apps.dociq.db", "AsyncSessionLocal"),
+    "init_dociq_db": ("apps.dociq.db", "init_dociq_db"),
+    "get_dociq_session": ("apps.dociq.db", "get_dociq_session"),
+}
 
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module_name, attr = _LAZY[name]
+        value = getattr(__import__(module_name, fromlist=[attr]), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
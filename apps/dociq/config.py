@@ -4,6 +4,17 @@ from typing import List
 
 class DociqSettings(BaseSettings):
     DATABASE_URL: str
+
+    # Connection pool settings
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 60  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = False  # keep disabled behind PgBouncer transaction mode
+    DB_SSL: bool = False  # verify the server with the default CA bundle when enabled
+    
+    # Largest request body accepted, in MiB (uploads are the only large bodies)
+    MAX_UPLOAD_MB: int = 200
     
     # CORS settings
     CORS_ORIGINS: List[str] = [
@@ -1,33 +1,58 @@
 from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from apps.dociq.config import get_dociq_settings
+import logging
 import ssl
 
-# Import models so SQLAlchemy can discover them
-from apps.dociq.models import Template, Document, Extraction, TargetMapping
-# Import auth models
-from core.auth.models import Tenant, User, UserSession
+logger = logging.getLogger(__name__)
 
 settings = get_dociq_settings()
 
-# Create async engine with explicit dialect and SSL handling
+# Reference table columns matched with ILIKE '%' || :value || '%' by the header-driven
+# background task; a btree cannot serve a leading wildcard, a pg_trgm GIN index can
+TRIGRAM_INDEXED_COLUMNS = (
+    ("customers", "cluster"),
+    ("customers", "customer"),
+    ("suppliers", "cluster"),
+    ("material_security_group", "cluster"),
+    ("material_security_group", "customer"),
+    ("material_security_group", "material_type"),
+)
+
+# Indexes existing databases of this app need, as (name, definition); built CONCURRENTLY
+# by ensure_indexes so writers are not blocked while they build
+APP_INDEXES = (
+    # Back keyset pagination of the extractions and templates lists (newest first)
+    ("extractions_created_at_id_idx", "extractions (created_at DESC, id DESC)"),
+    ("templates_created_at_id_idx", "templates (created_at DESC, id DESC)"),
+)
+
+# Create the single process-wide async engine with explicit pool sizing
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=False,
     future=True,
-    pool_pre_ping=True,
-    pool_recycle=300,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
     connect_args={
         "server_settings": {
-            "application_name": "consolidator_ai"
+            "application_name": "consolidator_ai",
+            "tcp_keepalives_idle": "30",
+            "tcp_keepalives_interval": "10",
+            "tcp_keepalives_count": "3"
         },
-        "ssl": False
+        "ssl": ssl.create_default_context() if settings.DB_SSL else False
     }
 )
 
 # Create async session factory
-AsyncSessionLocal = sessionmaker(
+AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
@@ -40,10 +65,89 @@ async def init_dociq_db():
         from core.auth.models import Tenant, User, UserSession
         
         await conn.run_sync(SQLModel.metadata.create_all)
+        # create_all does not add columns to existing tables
+        await conn.execute(text("ALTER TABLE templates ADD COLUMN IF NOT EXISTS field_mappings_text TEXT"))
+        # Timestamps default to the database clock; tables created before that need the column defaults set
+        for table in ("templates", "documents", "extractions", "target_mappings"):
+            await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN created_at SET DEFAULT now()"))
+            await conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN updated_at SET DEFAULT now()"))
+
+async def _create_index_concurrently(conn, name: str, definition: str, unique: bool = False) -> None:
+    """
+    Build one index with CREATE INDEX CONCURRENTLY on an AUTOCOMMIT connection
+
+    A failed or cancelled concurrent build leaves an INVALID index behind, which
+    IF NOT EXISTS would then skip on every boot; an invalid index of the same name
+    is dropped and built again instead.
+    """
+    result = await conn.execute(text(
+        "SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND pg_table_is_visible(c.oid)"
+    ), {"name": name})
+    if result.scalar_one_or_none() is False:
+        logger.warning("Rebuilding invalid index %s", name)
+        await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    await conn.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"
+    ))
+
+async def _ensure_template_name_index(conn) -> None:
+    """
+    Give templates created before names were unique the templates_name_key index
+
+    Concurrent creates could store duplicate names before the constraint existed. The
+    index is not built while any remain, so startup never fails on existing data; the
+    duplicates are logged to be renamed or removed.
+    """
+    result = await conn.execute(text(
+        "SELECT name, count(*) FROM templates GROUP BY name HAVING count(*) > 1 ORDER BY name"
+    ))
+    duplicates = result.all()
+    if duplicates:
+        logger.warning(
+            "Template names are not unique until these duplicates are renamed or removed: %s",
+            ", ".join(f"{name!r} ({count} templates)" for name, count in duplicates)
+        )
+        return
+    await _create_index_concurrently(conn, "templates_name_key", "templates (name)", unique=True)
+
+async def ensure_indexes():
+    """
+    Create the indexes in APP_INDEXES, the unique template name index and the pg_trgm
+    GIN indexes behind the reference table ILIKE lookups
+
+    Run as a background task so startup does not wait for the builds. Each statement runs
+    on its own in autocommit mode (CREATE INDEX CONCURRENTLY cannot run in a transaction
+    and does not block writers), and a failed build only logs a warning. The reference
+    tables are loaded outside this app, so a missing table or extension privilege is
+    expected there.
+    """
+    try:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for name, definition in APP_INDEXES:
+                try:
+                    await _create_index_concurrently(conn, name, definition)
+                except Exception as e:
+                    logger.warning("Skipped index %s: %s", name, e)
+            try:
+                await _ensure_template_name_index(conn)
+            except Exception as e:
+                logger.warning("Skipped index templates_name_key: %s", e)
+            try:
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            except Exception as e:
+                logger.warning("Could not create the pg_trgm extension: %s", e)
+            for table, column in TRIGRAM_INDEXED_COLUMNS:
+                try:
+                    await _create_index_concurrently(
+                        conn, f"ix_{table}_{column}_trgm", f"{table} USING gin ({column} gin_trgm_ops)"
+                    )
+                except Exception as e:
+                    logger.warning("Skipped trigram index on %s.%s: %s", table, column, e)
+    except Exception:
+        logger.exception("Error building indexes")
 
 async def get_dociq_session() -> AsyncSession:
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
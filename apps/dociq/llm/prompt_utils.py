@@ -1,18 +1,91 @@
 """
 Utility functions for reading and handling Jinja prompt templates
 """
-import json
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import orjson
+from functools import lru_cache
 from pathlib import Path
-from typing import List
-from jinja2 import Environment, FileSystemLoader
+from typing import Dict, List, Optional, Tuple
+import aiofiles
+import aiofiles.os
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+from jinja2 import Template as JinjaTemplate
 from uuid import UUID
-from common.utils.llm_connections import ask_llm
+from common.utils.llm_connections import ask_llm_async
 from apps.dociq.models.document import Document
-from apps.dociq.models.template import Template
+from apps.dociq.models.template import Template, format_field_mappings
 from apps.dociq.models.target_mapping import TargetMapping, TargetMappingEntry
+from apps.dociq.redis_client import redis_client, is_redis_available
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+logger = logging.getLogger(__name__)
+
+# Markdown code fence (optionally tagged json) wrapping an entire LLM response
+_FENCE_RE = re.compile(r"\A\s*```(?:json)?\s*(.*?)\s*```\s*\Z", re.S)
+
+
+# Prompt templates directory, resolved once at import
+_PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+# Single environment for prompts loaded from prompts/; compiled bytecode is cached on disk
+# so new workers skip re-parsing the templates. Prompt files only change on deploy, so
+# auto_reload is off to skip the mtime check on every get_template call. trim_blocks and
+# lstrip_blocks drop the whitespace around block tags at compile time; bytecode depends on
+# them, so it is cached under its own file pattern.
+_JINJA_ENV = Environment(
+    loader=FileSystemLoader(_PROMPTS_DIR),
+    autoescape=False,
+    trim_blocks=True,
+    lstrip_blocks=True,
+    cache_size=256,
+    auto_reload=False,
+    bytecode_cache=FileSystemBytecodeCache(pattern="__jinja2_dociq_trimmed_%s.cache")
+)
+
+
+# Formatted template field mappings are cached in Redis (shared) and in-process (L1).
+# L1 entries expire quickly so template updates made through another worker are
+# picked up without cross-process invalidation.
+FIELD_MAPPINGS_CACHE_TTL = 3600
+FIELD_MAPPINGS_LOCAL_TTL = 60
+FIELD_MAPPINGS_LOCAL_MAXSIZE = 512
+_field_mappings_local: Dict[UUID, Tuple[float, str]] = {}
+
+# Document markdown read for LLM prompts is cached in-process (L1) and in Redis (shared),
+# keyed by the markdown file's mtime so a rewritten file is never served stale
+DOCUMENT_CONTENT_CACHE_TTL = 3600
+DOCUMENT_CONTENT_LOCAL_TTL = 300
+DOCUMENT_CONTENT_LOCAL_MAXSIZE = 256
+_document_content_local: Dict[Tuple[UUID, int], Tuple[float, str]] = {}
+
+# LLM responses are cached in Redis by a hash of the rendered prompt, so retries of an
+# identical mapping/enhancement request skip the provider round-trip
+LLM_RESPONSE_CACHE_TTL = 86400
+
+
+@lru_cache(maxsize=1)
+def _content_mapper_tmpl() -> JinjaTemplate:
+    """Compiled content_mapper.j2 template, loaded once per process"""
+    return _JINJA_ENV.get_template("content_mapper.j2")
+
+
+@lru_cache(maxsize=1)
+def _content_enhancer_tmpl() -> JinjaTemplate:
+    """Compiled content_enhancer.j2 template, loaded once per process"""
+    return _JINJA_ENV.get_template("content_enhancer.j2")
+
+
+@lru_cache(maxsize=None)
+def _read_prompt_source(name: str) -> str:
+    """Source of a prompt template from prompts/, read from disk once per process"""
+    source, _, _ = _JINJA_ENV.loader.get_source(_JINJA_ENV, name)
+    return source
+
 
 def get_content_mapper_template() -> str:
     """
@@ -21,15 +94,7 @@ def get_content_mapper_template() -> str:
     Returns:
         The template content as a string
     """
-    # Get the path to the prompts directory
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    template_path = prompts_dir / "content_mapper.j2"
-    
-    # Read the template file
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
-    
-    return template_content
+    return _read_prompt_source("content_mapper.j2")
 
 
 def get_content_enhancer_template() -> str:
@@ -39,15 +104,7 @@ def get_content_enhancer_template() -> str:
     Returns:
         The template content as a string
     """
-    # Get the path to the prompts directory
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    template_path = prompts_dir / "content_enhancer.j2"
-    
-    # Read the template file
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
-    
-    return template_content
+    return _read_prompt_source("content_enhancer.j2")
 
 
 async def get_document_content(session: AsyncSession, document_id: UUID) -> str:
@@ -61,49 +118,119 @@ async def get_document_content(session: AsyncSession, document_id: UUID) -> str:
     Returns:
         Content of the file as string
     """
-    # Get document by ID
-    result = await session.execute(
-        select(Document).where(Document.id == document_id)
-    )
-    document = result.scalar_one_or_none()
+    # Only doc_path is needed, so skip hydrating the full Document row
+    doc_path = await _get_document_path(session, document_id)
     
-    if not document:
-        raise ValueError(f"Document {document_id} not found")
+    return await _read_document_content(document_id, doc_path)
+
+
+async def _read_document_content(document_id: UUID, doc_path: str) -> Optional[str]:
+    """
+    Read the markdown produced for a document, serving repeat reads from the in-process cache or Redis
     
-    # Look for markdown file using document ID in outputs directory
-    outputs_dir = Path("outputs")
-    if outputs_dir.exists():
-        md_filename = f"{document_id}.md"
-        md_file_path = outputs_dir / md_filename
+    Args:
+        document_id: UUID of the document
+        doc_path: Path of the originally uploaded file
         
-        if md_file_path.exists():
+    Returns:
+        Content of the file as string, or None if nothing could be read
+    """
+    md_file_path = Path("outputs") / f"{document_id}.md"
+    try:
+        mtime = (await aiofiles.os.stat(md_file_path)).st_mtime_ns
+    except OSError:
+        mtime = 0
+    key = (document_id, mtime)
+    
+    entry = _document_content_local.get(key)
+    if entry is not None:
+        expires_at, content = entry
+        if expires_at > time.monotonic():
+            return content
+        del _document_content_local[key]
+    
+    redis_key = _document_content_key(document_id, mtime)
+    content = None
+    if is_redis_available():
+        try:
+            cached = await redis_client.get(redis_key)
+            if cached is not None:
+                content = cached.decode('utf-8')
+        except Exception:
+            logger.exception("Error reading document content cache for document %s", document_id)
+    
+    if content is None:
+        content = await _load_document_content(document_id, md_file_path, doc_path)
+        if content is not None and is_redis_available():
             try:
-                with open(md_file_path, 'r', encoding='utf-8') as f:
-                    content = f.read().strip()
-                
-                if content:
-                    return content
-            except Exception as e:
-                print(f"Error reading markdown content from {md_file_path}: {e}")
+                await redis_client.set(redis_key, content, ex=DOCUMENT_CONTENT_CACHE_TTL)
+            except Exception:
+                logger.exception("Error caching document content for document %s", document_id)
+    
+    if content is not None:
+        if len(_document_content_local) >= DOCUMENT_CONTENT_LOCAL_MAXSIZE:
+            del _document_content_local[next(iter(_document_content_local))]
+        _document_content_local[key] = (time.monotonic() + DOCUMENT_CONTENT_LOCAL_TTL, content)
+    return content
+
+
+def _document_content_key(document_id: UUID, mtime: int) -> str:
+    return f"document:{document_id}:content:{mtime}"
+
+
+async def _load_document_content(document_id: UUID, md_file_path: Path, doc_path: str) -> Optional[str]:
+    """
+    Read the markdown produced for a document, falling back to the original doc_path
+    
+    Args:
+        document_id: UUID of the document
+        md_file_path: Path of the markdown file in the outputs directory
+        doc_path: Path of the originally uploaded file
+        
+    Returns:
+        Content of the file as string, or None if nothing could be read
+    """
+    try:
+        content = await _read_text(md_file_path)
+        if content is None:
+            logger.debug("Markdown file not found: %s", md_file_path)
         else:
-            print(f"Markdown file not found: {md_file_path}")
-    else:
-        print(f"Outputs directory does not exist: {outputs_dir}")
+            content = content.strip()
+            if content:
+                return content
+    except Exception:
+        logger.exception("Error reading markdown content from %s", md_file_path)
     
     # If markdown not found, try the original doc_path
-    if document.doc_path and Path(document.doc_path).exists():
+    if doc_path:
         try:
-            with open(document.doc_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if content.strip():
-                    return content
-        except Exception as e:
-            print(f"Error reading document content from {document.doc_path}: {e}")
-    
-    print(f"Could not find markdown content for document {document.id}")
+            content = await _read_text(Path(doc_path))
+            if content and content.strip():
+                return content
+        except Exception:
+            logger.exception("Error reading document content from %s", doc_path)
+    
+    logger.debug("Could not find markdown content for document %s", document_id)
     return None
 
 
+async def _read_text(path: Path) -> Optional[str]:
+    """
+    Read a UTF-8 text file without blocking the event loop
+    
+    Args:
+        path: Path of the file to read
+        
+    Returns:
+        File content, or None if the file does not exist
+    """
+    try:
+        async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+            return await f.read()
+    except FileNotFoundError:
+        return None
+
+
 async def get_template_field_mappings(session: AsyncSession, template_id: UUID) -> str:
     """
     Get template content and extract field_mappings as text
@@ -115,26 +242,156 @@ async def get_template_field_mappings(session: AsyncSession, template_id: UUID)
     Returns:
         Field mappings as formatted text string
     """
-    # Get template by ID
+    cached = await _get_cached_field_mappings(template_id)
+    if cached is not None:
+        return cached
+    
+    return await _fetch_field_mappings_text(session, template_id)
+
+
+async def _fetch_field_mappings_text(session: AsyncSession, template_id: UUID) -> str:
+    """
+    Load field mappings text from the database and write it to both cache tiers
+    
+    Args:
+        session: Database session
+        template_id: UUID of the template
+        
+    Returns:
+        Field mappings as formatted text string
+    """
+    # Project only the pre-formatted text column instead of the full Template row
+    result = await session.execute(
+        select(Template.field_mappings_text).where(Template.id == template_id)
+    )
+    field_mappings_text = result.scalar_one_or_none()
+    
+    if field_mappings_text is None:
+        field_mappings_text = await _load_field_mappings_text(session, template_id)
+    
+    await _cache_field_mappings(template_id, field_mappings_text)
+    return field_mappings_text
+
+
+def _field_mappings_key(template_id: UUID) -> str:
+    return f"tmpl:fm:{template_id}"
+
+
+async def _get_cached_field_mappings(template_id: UUID) -> Optional[str]:
+    """
+    Look up formatted field mappings in the in-process cache, then in Redis
+    
+    Args:
+        template_id: UUID of the template
+        
+    Returns:
+        Cached field mappings text, or None on a miss
+    """
+    entry = _field_mappings_local.get(template_id)
+    if entry is not None:
+        expires_at, field_mappings_text = entry
+        if expires_at > time.monotonic():
+            return field_mappings_text
+        del _field_mappings_local[template_id]
+    
+    if not is_redis_available():
+        return None
+    
+    try:
+        cached = await redis_client.get(_field_mappings_key(template_id))
+    except Exception:
+        logger.exception("Error reading field mappings cache for template %s", template_id)
+        return None
+    
+    if cached is None:
+        return None
+    
+    field_mappings_text = cached.decode('utf-8')
+    _remember_field_mappings(template_id, field_mappings_text)
+    return field_mappings_text
+
+
+def _remember_field_mappings(template_id: UUID, field_mappings_text: str) -> None:
+    """Store formatted field mappings in the in-process cache, evicting the oldest entry when full"""
+    _field_mappings_local.pop(template_id, None)
+    if len(_field_mappings_local) >= FIELD_MAPPINGS_LOCAL_MAXSIZE:
+        del _field_mappings_local[next(iter(_field_mappings_local))]
+    _field_mappings_local[template_id] = (time.monotonic() + FIELD_MAPPINGS_LOCAL_TTL, field_mappings_text)
+
+
+async def _cache_field_mappings(template_id: UUID, field_mappings_text: str) -> None:
+    """Write formatted field mappings to both cache tiers"""
+    _remember_field_mappings(template_id, field_mappings_text)
+    
+    if not is_redis_available():
+        return
+    
+    try:
+        await redis_client.set(_field_mappings_key(template_id), field_mappings_text, ex=FIELD_MAPPINGS_CACHE_TTL)
+    except Exception:
+        logger.exception("Error caching field mappings for template %s", template_id)
+
+
+async def invalidate_template_field_mappings(template_id: UUID) -> None:
+    """
+    Drop cached field mappings for a template after it is updated or deleted
+    
+    Args:
+        template_id: UUID of the template
+    """
+    _field_mappings_local.pop(template_id, None)
+    
+    if not is_redis_available():
+        return
+    
+    try:
+        await redis_client.delete(_field_mappings_key(template_id))
+    except Exception:
+        logger.exception("Error invalidating field mappings cache for template %s", template_id)
+
+
+async def _load_field_mappings_text(session: AsyncSession, template_id: UUID) -> str:
+    """
+    Build field mappings text from the JSONB column for templates saved before field_mappings_text existed
+    
+    Args:
+        session: Database session
+        template_id: UUID of the template
+        
+    Returns:
+        Field mappings as formatted text string
+    """
     result = await session.execute(
-        select(Template).where(Template.id == template_id)
+        select(Template.field_mappings).where(Template.id == template_id)
     )
-    template = result.scalar_one_or_none()
+    field_mappings = result.scalar_one_or_none()
     
-    if not template:
+    if field_mappings is None:
         raise ValueError(f"Template {template_id} not found")
     
-    # Extract field_mappings and format as text
-    field_mappings_text = []
-    for i, field_mapping in enumerate(template.field_mappings, 1):
-        field_text = f"{i}. Target Field: {field_mapping['target_field']}\n"
-        field_text += f"   Sample Field Names: {', '.join(field_mapping['sample_field_names'])}\n"
-        field_text += f"   Value Patterns: {', '.join(field_mapping['value_patterns'])}\n"
-        field_text += f"   Description: {field_mapping['description']}\n"
-        field_text += f"   Required: {field_mapping['required']}\n"
-        field_mappings_text.append(field_text)
+    return format_field_mappings(field_mappings)
+
+
+async def _get_document_path(session: AsyncSession, document_id: UUID) -> str:
+    """
+    Fetch only the doc_path of a document
+    
+    Args:
+        session: Database session
+        document_id: UUID of the document
+        
+    Returns:
+        The document's doc_path
+    """
+    result = await session.execute(
+        select(Document.doc_path).where(Document.id == document_id)
+    )
+    doc_path = result.scalar_one_or_none()
     
-    return "\n".join(field_mappings_text)
+    if doc_path is None:
+        raise ValueError(f"Document {document_id} not found")
+    
+    return doc_path
 
 
 async def process_content_mapping(document_id: UUID, template_id: UUID, session: AsyncSession, cluster: str = None, customer: str = None):
@@ -151,29 +408,34 @@ async def process_content_mapping(document_id: UUID, template_id: UUID, session:
     Returns:
         Mapping results
     """
-    # Get template field mappings
-    template_field_mappings = await get_template_field_mappings(session, template_id)
-    
-    # Get document content
-    document_content = await get_document_content(session, document_id)
-    
-    # Get the Jinja template
-    template_content = get_content_mapper_template()
-    
-    # Set up Jinja environment and render template
-    jinja_env = Environment(autoescape=False)
-    template = jinja_env.from_string(template_content)
+    # Look up cached field mappings while the document path query is in flight;
+    # only the path query touches the session, so the two can run concurrently
+    template_field_mappings, doc_path = await asyncio.gather(
+        _get_cached_field_mappings(template_id),
+        _get_document_path(session, document_id)
+    )
+    # Get document content; on a field mapping cache miss read it while the database
+    # fallback runs, since again only that query touches the session
+    if template_field_mappings is None:
+        template_field_mappings, document_content = await asyncio.gather(
+            _fetch_field_mappings_text(session, template_id),
+            _read_document_content(document_id, doc_path)
+        )
+    else:
+        document_content = await _read_document_content(document_id, doc_path)
     
-    # Render template with the retrieved data
-    rendered_prompt = template.render(
+    # Render the cached Jinja template with the retrieved data
+    rendered_prompt = _content_mapper_tmpl().render(
         template_info=template_field_mappings,
         md_content=document_content,
         cluster=cluster,
         customer=customer
     )
     
-    # Call LLM using llm_connections.py
-    response = ask_llm(rendered_prompt)
+    # Reuse a cached response for an identical prompt, otherwise call the LLM without blocking the event loop
+    cache_key = _llm_response_key("map", rendered_prompt)
+    cached_response = await _get_cached_llm_response(cache_key)
+    response = cached_response if cached_response is not None else await ask_llm_async(rendered_prompt)
     
     # Create response data structure
     response_data = {
@@ -185,6 +447,10 @@ async def process_content_mapping(document_id: UUID, template_id: UUID, session:
     # Parse the LLM response and return target mappings
     target_mapping = await parse_llm_response(response_data)
     
+    # Only cache responses that parsed, so a malformed answer is retried against the LLM
+    if cached_response is None:
+        await _cache_llm_response(cache_key, response)
+    
     return target_mapping
 
 
@@ -199,12 +465,8 @@ async def process_content_enhancement(target_mappings: List[dict], redis_data: d
     Returns:
         LLM enhancement response
     """
-    # Get the Jinja template
-    template_content = get_content_enhancer_template()
-    
-    # Set up Jinja environment and render template
-    jinja_env = Environment(autoescape=False)
-    template = jinja_env.from_string(template_content)
+    # Get the cached Jinja template
+    template = _content_enhancer_tmpl()
     
     # Prepare data for template rendering
     template_data = {
@@ -216,24 +478,63 @@ async def process_content_enhancement(target_mappings: List[dict], redis_data: d
     # Render template with the data
     rendered_prompt = template.render(**template_data)
     
-    # Log the rendered prompt for debugging
-    print("=== LLM Enhancement Prompt ===")
-    print(rendered_prompt[:500] + "..." if len(rendered_prompt) > 500 else rendered_prompt)
-    print("=== End Prompt ===")
+    # Log the rendered prompt for debugging; %.500s truncates only if the record is emitted
+    logger.debug("LLM enhancement prompt: %.500s", rendered_prompt)
     
-    # Call LLM using llm_connections.py
-    response = ask_llm(rendered_prompt)
+    # Reuse a cached response for an identical prompt, otherwise call the LLM without blocking the event loop
+    cache_key = _llm_response_key("enhance", rendered_prompt)
+    cached_response = await _get_cached_llm_response(cache_key)
+    response = cached_response if cached_response is not None else await ask_llm_async(rendered_prompt)
     
-    print(f"=== LLM Raw Response ===")
-    print(response[:300] + "..." if len(response) > 300 else response)
-    print("=== End Raw Response ===")
+    logger.debug("LLM enhancement raw response: %.300s", response)
     
     # Parse and clean the response
     cleaned_response = parse_llm_enhancement_response(response)
     
+    if cached_response is None and cleaned_response["status"] == "success":
+        await _cache_llm_response(cache_key, response)
+    
     return cleaned_response
 
 
+def _llm_response_key(kind: str, rendered_prompt: str) -> str:
+    digest = hashlib.blake2b(rendered_prompt.encode('utf-8'), digest_size=16).hexdigest()
+    return f"llm:{kind}:{digest}"
+
+
+async def _get_cached_llm_response(cache_key: str) -> Optional[str]:
+    """
+    Look up a cached LLM response in Redis
+    
+    Args:
+        cache_key: Key built by _llm_response_key
+        
+    Returns:
+        Cached response text, or None on a miss
+    """
+    if not is_redis_available():
+        return None
+    
+    try:
+        cached = await redis_client.get(cache_key)
+    except Exception:
+        logger.exception("Error reading LLM response cache %s", cache_key)
+        return None
+    
+    return cached.decode('utf-8') if cached is not None else None
+
+
+async def _cache_llm_response(cache_key: str, response: str) -> None:
+    """Store an LLM response in Redis for identical prompts"""
+    if not response or not is_redis_available():
+        return
+    
+    try:
+        await redis_client.set(cache_key, response, ex=LLM_RESPONSE_CACHE_TTL)
+    except Exception:
+        logger.exception("Error caching LLM response %s", cache_key)
+
+
 def parse_llm_enhancement_response(raw_response: str) -> dict:
     """
     Parse and clean the LLM enhancement response to extract structured JSON
@@ -246,19 +547,12 @@ def parse_llm_enhancement_response(raw_response: str) -> dict:
     """
     try:
         # Remove markdown code blocks if present
-        cleaned_response = raw_response.strip()
-        
-        # Check if response is wrapped in markdown code blocks
-        if cleaned_response.startswith('```json') and cleaned_response.endswith('```'):
-            # Extract JSON from markdown code block
-            cleaned_response = cleaned_response[7:-3].strip()  # Remove ```json and ```
-        elif cleaned_response.startswith('```') and cleaned_response.endswith('```'):
-            # Extract content from generic code block
-            cleaned_response = cleaned_response[3:-3].strip()  # Remove ``` and ```
+        match = _FENCE_RE.match(raw_response)
+        cleaned_response = match.group(1) if match else raw_response.strip()
         
         # Try to parse as JSON
         try:
-            enhanced_mappings = json.loads(cleaned_response)
+            enhanced_mappings = orjson.loads(cleaned_response)
             
             # Validate that it's a list of mappings
             if not isinstance(enhanced_mappings, list):
@@ -282,8 +576,8 @@ def parse_llm_enhancement_response(raw_response: str) -> dict:
                 "total_fields": len(enhanced_mappings)
             }
             
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse LLM response as JSON: {e}")
+        except orjson.JSONDecodeError as e:
+            logger.warning("Failed to parse LLM response as JSON: %s", e)
             return {
                 "status": "parse_error",
                 "error": f"JSON parsing failed: {str(e)}",
@@ -291,7 +585,7 @@ def parse_llm_enhancement_response(raw_response: str) -> dict:
             }
     
     except Exception as e:
-        print(f"Error processing LLM enhancement response: {e}")
+        logger.exception("Error processing LLM enhancement response")
         return {
             "status": "error",
             "error": str(e),
@@ -325,7 +619,7 @@ async def parse_llm_response(response_data: dict) -> TargetMapping:
             raise ValueError("Missing 'result' field in response data")
         
         # Parse the JSON string into a list of dictionaries
-        field_mappings = json.loads(result_json_str)
+        field_mappings = orjson.loads(result_json_str)
         
         if not isinstance(field_mappings, list):
             raise ValueError("Result must be a JSON array")
@@ -353,7 +647,7 @@ async def parse_llm_response(response_data: dict) -> TargetMapping:
         
         return target_mapping
         
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in result field: {e}")
     except Exception as e:
         raise ValueError(f"Error parsing LLM response: {e}") 
\ No newline at end of file
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, Literal, List
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, func
 import sqlalchemy.dialects.postgresql as pg
 
 
@@ -23,10 +23,10 @@ class Document(SQLModel, table=True):
     doc_path: str = Field(sa_column=Column(pg.TEXT, nullable=False))
 
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     )
 
     # Relationships
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, func
 import sqlalchemy.dialects.postgresql as pg
 
 
@@ -34,7 +34,7 @@ class Extraction(SQLModel, table=True):
         sa_column=Column(pg.VARCHAR(100), nullable=True)
     )
     status: Optional[str] = Field(
-        default="uploaded",
+        default="queued",
         sa_column=Column(pg.VARCHAR(50), nullable=True)
     )
 
@@ -54,10 +54,10 @@ class Extraction(SQLModel, table=True):
 
     # Timestamps
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     )
 
     # Relationships
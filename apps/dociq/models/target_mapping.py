@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, func
 import sqlalchemy.dialects.postgresql as pg
 from pydantic import BaseModel
 
@@ -36,60 +36,116 @@ class TargetMapping(SQLModel, table=True):
     )
 
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     )
 
     # Relationships
     extractions: List["Extraction"] = Relationship(back_populates="target_mapping")
 
+    # Fetch server-generated timestamps with RETURNING on INSERT instead of a later refresh
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         return f"<TargetMapping {self.id} (Confidence: {self.overall_confidence})>"
 
     def calculate_overall_confidence(self) -> float:
         """Calculate overall confidence as sum of individual target confidences"""
-        if not self.target_mappings:
-            return 0.0
-        
-        total_confidence = 0.0
-        valid_entries = 0
-        
-        for mapping in self.target_mappings:
-            if mapping.get('target_confidence') is not None:
-                total_confidence += mapping['target_confidence']
-                valid_entries += 1
-        
+        total_confidence, valid_entries = self._confidence_totals()
         return total_confidence if valid_entries > 0 else 0.0
 
     def update_overall_confidence(self) -> None:
         """Update the overall_confidence field with calculated value"""
+        # Entries may have been edited or replaced in place, so recompute instead of trusting
+        # the running totals or the field index
+        self.__dict__.pop("_confidence_totals_cache", None)
+        self.__dict__.pop("_field_index_cache", None)
         self.overall_confidence = self.calculate_overall_confidence()
 
+    def _confidence_totals(self) -> Tuple[float, int]:
+        """
+        Running (sum, count) of non-null target confidences.
+
+        Kept in the instance __dict__ (not a column) and rebuilt with one pass whenever
+        target_mappings was replaced or changed size outside add_target_mapping.
+        """
+        cached = self.__dict__.get("_confidence_totals_cache")
+        if cached is not None and cached[0] is self.target_mappings and cached[1] == len(self.target_mappings or []):
+            return cached[2], cached[3]
+
+        valid_confidences = [
+            confidence for confidence in (m.get('target_confidence') for m in self.target_mappings or [])
+            if confidence is not None
+        ]
+        total_confidence = float(sum(valid_confidences))
+        valid_entries = len(valid_confidences)
+        self._store_confidence_totals(total_confidence, valid_entries)
+        return total_confidence, valid_entries
+
+    def _store_confidence_totals(self, total_confidence: float, valid_entries: int) -> None:
+        self.__dict__["_confidence_totals_cache"] = (
+            self.target_mappings, len(self.target_mappings or []), total_confidence, valid_entries
+        )
+
     def add_target_mapping(self, target_field: str, target_value: str, target_confidence: Optional[float] = None) -> None:
-        """Add a new target mapping entry and update overall confidence"""
+        """Add a new target mapping entry and update overall confidence in O(1)"""
+        total_confidence, valid_entries = self._confidence_totals()
+        field_index = self._field_index()
         mapping_entry = {
             "target_field": target_field,
             "target_value": target_value,
             "target_confidence": target_confidence
         }
         self.target_mappings.append(mapping_entry)
-        self.update_overall_confidence()
+        field_index.setdefault(target_field, mapping_entry)
+        self._store_field_index(field_index)
+        if target_confidence is not None:
+            total_confidence += target_confidence
+            valid_entries += 1
+        self._store_confidence_totals(total_confidence, valid_entries)
+        self.overall_confidence = total_confidence if valid_entries > 0 else 0.0
+
+    def _field_index(self) -> Dict[str, dict]:
+        """
+        target_field -> first mapping entry with that field.
+
+        Transient like the confidence totals: kept in the instance __dict__ and rebuilt
+        whenever target_mappings was replaced or changed size outside add_target_mapping.
+        """
+        cached = self.__dict__.get("_field_index_cache")
+        if cached is not None and cached[0] is self.target_mappings and cached[1] == len(self.target_mappings or []):
+            return cached[2]
+
+        index: Dict[str, dict] = {}
+        for mapping in self.target_mappings or []:
+            index.setdefault(mapping.get('target_field'), mapping)
+        self._store_field_index(index)
+        return index
+
+    def _store_field_index(self, index: Dict[str, dict]) -> None:
+        self.__dict__["_field_index_cache"] = (self.target_mappings, len(self.target_mappings or []), index)
 
     def get_mapping_by_field(self, target_field: str) -> Optional[dict]:
         """Get a specific mapping entry by target field"""
-        for mapping in self.target_mappings:
-            if mapping.get('target_field') == target_field:
-                return mapping
-        return None
+        return self._field_index().get(target_field)
 
     def update_mapping_confidence(self, target_field: str, new_confidence: float) -> bool:
         """Update confidence for a specific target field"""
         mapping = self.get_mapping_by_field(target_field)
         if mapping:
+            total_confidence, valid_entries = self._confidence_totals()
+            old_confidence = mapping.get('target_confidence')
+            if old_confidence is not None:
+                total_confidence -= old_confidence
+                valid_entries -= 1
+            if new_confidence is not None:
+                total_confidence += new_confidence
+                valid_entries += 1
             mapping['target_confidence'] = new_confidence
-            self.update_overall_confidence()
+            self._store_confidence_totals(total_confidence, valid_entries)
+            self.overall_confidence = total_confidence if valid_entries > 0 else 0.0
             return True
         return False
 
@@ -101,8 +157,5 @@ class TargetMapping(SQLModel, table=True):
     @property
     def average_confidence(self) -> float:
         """Calculate average confidence across all mappings"""
-        if not self.target_mappings:
-            return 0.0
-        
-        valid_confidences = [m.get('target_confidence') for m in self.target_mappings if m.get('target_confidence') is not None]
-        return sum(valid_confidences) / len(valid_confidences) if valid_confidences else 0.0 
\ No newline at end of file
+        total_confidence, valid_entries = self._confidence_totals()
+        return total_confidence / valid_entries if valid_entries > 0 else 0.0 
\ No newline at end of file
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional, List, Literal
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import Column, event, func
 import sqlalchemy.dialects.postgresql as pg
 from pydantic import BaseModel
 
@@ -16,6 +16,26 @@ class FieldMapping(BaseModel):
     required: bool = True
 
 
+def format_field_mappings(field_mappings: List[dict]) -> str:
+    """Format field mappings as the text block used in LLM prompts"""
+    # A list is either all dicts (loaded from JSONB) or all FieldMapping models (built in
+    # Python), so check the first entry once instead of every entry
+    if field_mappings and isinstance(field_mappings[0], BaseModel):
+        field_mappings = [field_mapping.model_dump() for field_mapping in field_mappings]
+
+    # One f-string per entry collected into a list, joined once at the end
+    parts = []
+    for i, field_mapping in enumerate(field_mappings, 1):
+        parts.append(
+            f"{i}. Target Field: {field_mapping['target_field']}\n"
+            f"   Sample Field Names: {', '.join(field_mapping['sample_field_names'])}\n"
+            f"   Value Patterns: {', '.join(field_mapping['value_patterns'])}\n"
+            f"   Description: {field_mapping.get('description')}\n"
+            f"   Required: {field_mapping.get('required', True)}\n"
+        )
+    return "\n".join(parts)
+
+
 class Template(SQLModel, table=True):
     __tablename__ = "templates"
 
@@ -24,7 +44,7 @@ class Template(SQLModel, table=True):
         sa_column=Column(pg.UUID(as_uuid=True), primary_key=True, nullable=False)
     )
 
-    name: str = Field(sa_column=Column(pg.VARCHAR(255), nullable=False))
+    name: str = Field(sa_column=Column(pg.VARCHAR(255), nullable=False, unique=True))
     type: Literal["pdf", "excel"] = Field(sa_column=Column(pg.VARCHAR(50), nullable=False))
     category: str = Field(sa_column=Column(pg.VARCHAR(100), nullable=False))
     description: Optional[str] = Field(default=None, sa_column=Column(pg.TEXT, nullable=True))
@@ -33,16 +53,18 @@ class Template(SQLModel, table=True):
     field_mappings: List[FieldMapping] = Field(
         sa_column=Column(pg.JSONB, nullable=False, default=list)
     )
+    # Prompt-ready rendering of field_mappings, kept in sync on insert/update
+    field_mappings_text: Optional[str] = Field(default=None, sa_column=Column(pg.TEXT, nullable=True))
 
     # Excel-specific
     header_row: Optional[int] = Field(default=None, sa_column=Column(pg.INTEGER, nullable=True))
     sheetname: Optional[str] = Field(default=None, sa_column=Column(pg.VARCHAR(100), nullable=True))
 
     created_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
     )
     updated_at: datetime = Field(
-        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+        sa_column=Column(pg.TIMESTAMP(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
     )
 
     # Relationships
@@ -54,3 +76,9 @@ class Template(SQLModel, table=True):
     @property
     def fields(self) -> int:
         return len(self.field_mappings)
+
+
+@event.listens_for(Template, "before_insert")
+@event.listens_for(Template, "before_update")
+def _set_field_mappings_text(mapper, connection, target: Template) -> None:
+    target.field_mappings_text = format_field_mappings(target.field_mappings or [])
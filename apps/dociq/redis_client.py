@@ -0,0 +1,71 @@
+"""
+Shared async Redis client for dociq caches
+"""
+import asyncio
+import logging
+import os
+from typing import Optional
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+# Configure Redis connection with environment variable fallbacks
+REDIS_HOST = os.getenv('REDIS_HOST', 'big-bear-redis')
+REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
+REDIS_USERNAME = os.getenv('REDIS_USERNAME', 'default')
+REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', '12345')
+
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+
+# One connection pool per process, sized for peak concurrency; every caller shares redis_client
+_pool = aioredis.ConnectionPool(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    username=REDIS_USERNAME,
+    password=REDIS_PASSWORD,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    health_check_interval=30,
+    socket_keepalive=True,
+    socket_connect_timeout=5,
+    socket_timeout=5
+)
+
+redis_client = aioredis.Redis(connection_pool=_pool)
+
+_redis_available = False
+_init_lock: Optional[asyncio.Lock] = None
+
+
+async def init_redis_connection() -> bool:
+    """Ping Redis once and remember whether it is reachable; concurrent callers share one ping"""
+    global _redis_available, _init_lock
+    if _redis_available:
+        return True
+    
+    # Created lazily so the lock binds to the running event loop
+    if _init_lock is None:
+        _init_lock = asyncio.Lock()
+    
+    async with _init_lock:
+        if _redis_available:
+            return True
+        try:
+            await redis_client.ping()
+            _redis_available = True
+            logger.info("Async Redis connection established successfully to %s:%s", REDIS_HOST, REDIS_PORT)
+        except Exception as e:
+            _redis_available = False
+            logger.warning("Async Redis connection failed: %s", e)
+    return _redis_available
+
+
+def is_redis_available() -> bool:
+    """Whether the startup ping reached Redis"""
+    return _redis_available
+
+
+async def close_redis_connection() -> None:
+    """Close the shared client and disconnect its connection pool on shutdown"""
+    global _redis_available
+    _redis_available = False
+    await redis_client.aclose(close_connection_pool=True)
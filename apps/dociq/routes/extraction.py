@@ -1,17 +1,52 @@
-from typing import Optional, Dict, Any, List
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, WebSocket, Query, BackgroundTasks, Request
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, WebSocket, WebSocketDisconnect, Query, Header, BackgroundTasks, Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from apps.dociq.db import get_dociq_session
-from apps.dociq.services.extraction_service import ExtractionService
+from apps.dociq.db import get_dociq_session, AsyncSessionLocal
+from common.dependancies import keyset_cursor
+# Registers the "anyuuid" path convertor the routes below declare
+import common.convertors
+from apps.dociq.redis_client import redis_client, is_redis_available
+from apps.dociq.services.extraction_service import ExtractionService, ExtractionNotReadyError, extraction_status_channel
 from apps.dociq.schemas.extraction import ExtractionRead
 from apps.dociq.llm.prompt_utils import process_content_enhancement
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
 
+router = APIRouter(default_response_class=ORJSONResponse)
 
+# Extraction statuses after which Mistral processing has finished
+EXTRACTION_FINAL_STATUSES = ("extracted", "extraction_failed")
+
+# Seconds /extractions/{id}/ws waits for a final status before closing the connection
+EXTRACTION_STATUS_WEBSOCKET_TIMEOUT = 30 * 60
+
+# Messages buffered per /extractions/ws client before the forwarder waits on the client
+WEBSOCKET_OUTBOUND_QUEUE_SIZE = 64
+
+# File types accepted for extraction
+ALLOWED_EXTENSIONS = frozenset({'.pdf', '.xlsx', '.xls'})
+ALLOWED_EXTENSIONS_STR = ', '.join(('.pdf', '.xlsx', '.xls'))
+
+# Leading bytes each accepted file type must start with
+FILE_SIGNATURES = {
+    '.pdf': b'%PDF-',
+    '.xlsx': b'PK\x03\x04',
+    '.xls': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+}
+FILE_SIGNATURE_LENGTH = max(len(signature) for signature in FILE_SIGNATURES.values())
+
+
+# Response models below document the simple handlers' shapes; those handlers return
+# ORJSONResponse dicts directly so no validate/dump pass runs per request
 class ExtractionResponse(BaseModel):
     extraction_id: UUID
     document_id: UUID
@@ -30,8 +65,8 @@ class UpdateTemplateResponse(BaseModel):
     message: str
 
 
-class ProceedToNextStepRequest(BaseModel):
-    template_id: UUID
+# Both template endpoints take the same body; one model keeps a single validator and schema
+ProceedToNextStepRequest = UpdateTemplateRequest
 
 
 class ProceedToNextStepResponse(BaseModel):
@@ -58,42 +93,52 @@ async def get_extraction_service(session: AsyncSession = Depends(get_dociq_sessi
     return ExtractionService(session)
 
 
-@router.post("/extractions/", response_model=ExtractionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/extractions/", response_model=ExtractionResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_extraction(
     request: Request,
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    no_cache: bool = Query(False, description="Run Mistral even if this exact file was extracted before"),
     extraction_service: ExtractionService = Depends(get_extraction_service)
 ):
     """
     Step 1: Upload document and start extraction process
     
     - **file**: PDF/Excel file to upload and process
-    - Returns extraction_id for tracking the KYC flow
+    - **no_cache**: Skip the cached result for an identical earlier upload
+    - Returns extraction_id for tracking the KYC flow; Mistral runs in the background and
+      status changes are pushed on /extractions/{extraction_id}/ws
     """
     # Validate file type
-    allowed_extensions = ['.pdf', '.xlsx', '.xls']
-    file_extension = '.' + file.filename.split('.')[-1].lower() if '.' in file.filename else ''
+    file_extension = os.path.splitext(file.filename)[1].lower()
     
-    if file_extension not in allowed_extensions:
+    if file_extension not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type: {file_extension}. Allowed types: {', '.join(allowed_extensions)}"
+            detail=f"Unsupported file type: {file_extension}. Allowed types: {ALLOWED_EXTENSIONS_STR}"
         )
     
+    # Check the content matches the extension before anything is written to disk
+    header = await file.read(FILE_SIGNATURE_LENGTH)
+    if not header.startswith(FILE_SIGNATURES[file_extension]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content does not match its {file_extension} extension"
+        )
+    await file.seek(0)
+    
     try:
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
+        # Stream the upload to disk instead of buffering it in memory
+        file_path, file_size, content_hash = await extraction_service.save_upload(file)
         
         # Extract headers for cluster, customer, and material type information
         cluster = request.headers.get("X-Cluster")
         customer = request.headers.get("X-Customer")
         material_type = request.headers.get("X-Material-Type")
         
-        # Create extraction and document records, process with Mistral
+        # Create extraction and document records
         extraction, document = await extraction_service.create_extraction_with_document(
-            file_bytes=file_content,
+            file_path=file_path,
             filename=file.filename,
             file_size=file_size,
             cluster=cluster,
@@ -101,13 +146,17 @@ async def create_extraction(
             material_type=material_type
         )
         
-        # Determine response message based on processing result
-        if extraction.status == "extracted":
-            message = "Document uploaded and processed successfully with Mistral"
-        elif extraction.status == "extraction_failed":
-            message = "Document uploaded but Mistral processing failed"
-        else:
-            message = "Document uploaded successfully"
+        # Process with Mistral after the response is sent
+        background_tasks.add_task(
+            extraction_service.run_mistral_extraction,
+            extraction_id=extraction.id,
+            document_id=document.id,
+            file_path=file_path,
+            filename=file.filename,
+            content_hash=content_hash,
+            use_cache=not no_cache
+        )
+        message = "Document uploaded successfully, Mistral processing queued"
         
         # Add background task if headers are present
         if cluster and customer:
@@ -120,13 +169,13 @@ async def create_extraction(
                 document_id=str(document.id)
             )
         
-        return ExtractionResponse(
-            extraction_id=extraction.id,
-            document_id=document.id,
-            status=extraction.status,
-            current_step=extraction.current_step,
-            message=message
-        )
+        return ORJSONResponse({
+            "extraction_id": extraction.id,
+            "document_id": document.id,
+            "status": extraction.status,
+            "current_step": extraction.current_step,
+            "message": message
+        }, status_code=status.HTTP_202_ACCEPTED)
         
     except HTTPException:
         raise
@@ -141,6 +190,7 @@ async def create_extraction(
 async def get_all_extractions(
     limit: Optional[int] = Query(None, ge=1, le=100, description="Number of extractions to return (max 100)"),
     offset: Optional[int] = Query(None, ge=0, description="Number of extractions to skip"),
+    cursor: Optional[Tuple[datetime, UUID]] = Depends(keyset_cursor),
     extraction_service: ExtractionService = Depends(get_extraction_service)
 ):
     """
@@ -148,10 +198,12 @@ async def get_all_extractions(
     
     - **limit**: Maximum number of extractions to return (1-100)
     - **offset**: Number of extractions to skip for pagination
+    - **after**: Keyset cursor built from the created_at and id of the last extraction
+      already received; takes precedence over offset and stays fast on deep pages
     - Returns list of extraction records ordered by creation date (newest first)
     """
     try:
-        extractions = await extraction_service.get_all_extractions(limit=limit, offset=offset)
+        extractions = await extraction_service.get_all_extractions(limit=limit, offset=offset, after=cursor)
         return extractions
         
     except Exception as e:
@@ -161,7 +213,7 @@ async def get_all_extractions(
         )
 
 
-@router.get("/extractions/{extraction_id}", response_model=ExtractionRead)
+@router.get("/extractions/{extraction_id:anyuuid}", response_model=ExtractionRead)
 async def get_extraction(
     extraction_id: UUID,
     extraction_service: ExtractionService = Depends(get_extraction_service)
@@ -183,7 +235,7 @@ async def get_extraction(
     return extraction
 
 
-@router.patch("/extractions/{extraction_id}", response_model=UpdateTemplateResponse)
+@router.patch("/extractions/{extraction_id:anyuuid}", response_model=UpdateTemplateResponse)
 async def update_extraction_template(
     extraction_id: UUID,
     request: UpdateTemplateRequest,
@@ -208,11 +260,11 @@ async def update_extraction_template(
                 detail=f"Extraction with ID {extraction_id} not found"
             )
         
-        return UpdateTemplateResponse(
-            extraction_id=updated_extraction.id,
-            template_id=updated_extraction.template_id,
-            message=f"Template {request.template_id} successfully assigned to extraction {extraction_id}"
-        )
+        return ORJSONResponse({
+            "extraction_id": updated_extraction.id,
+            "template_id": updated_extraction.template_id,
+            "message": f"Template {request.template_id} successfully assigned to extraction {extraction_id}"
+        })
         
     except HTTPException:
         raise
@@ -223,7 +275,7 @@ async def update_extraction_template(
         )
 
 
-@router.patch("/extractions/{extraction_id}/proceed", response_model=ProceedToNextStepResponse)
+@router.patch("/extractions/{extraction_id:anyuuid}/proceed", response_model=ProceedToNextStepResponse)
 async def proceed_to_next_step(
     extraction_id: UUID,
     request: ProceedToNextStepRequest,
@@ -249,12 +301,12 @@ async def proceed_to_next_step(
                 detail=f"Extraction with ID {extraction_id} not found"
             )
         
-        return ProceedToNextStepResponse(
-            extraction_id=updated_extraction.id,
-            template_id=updated_extraction.template_id,
-            current_step=updated_extraction.current_step,
-            message=f"Successfully proceeded to next step. Template {request.template_id} assigned and current step updated to '{updated_extraction.current_step}'"
-        )
+        return ORJSONResponse({
+            "extraction_id": updated_extraction.id,
+            "template_id": updated_extraction.template_id,
+            "current_step": updated_extraction.current_step,
+            "message": f"Successfully proceeded to next step. Template {request.template_id} assigned and current step updated to '{updated_extraction.current_step}'"
+        })
         
     except HTTPException:
         raise
@@ -265,7 +317,7 @@ async def proceed_to_next_step(
         )
 
 
-@router.post("/extractions/{extraction_id}/map")
+@router.post("/extractions/{extraction_id:anyuuid}/map")
 async def map_extraction(
     extraction_id: UUID,
     extraction_service: ExtractionService = Depends(get_extraction_service)
@@ -285,6 +337,11 @@ async def map_extraction(
             "result": result
         }
         
+    except ExtractionNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -297,10 +354,13 @@ async def map_extraction(
         ) 
 
 
-@router.post("/extractions/{extraction_id}/enhance", response_model=EnhanceExtractionResponse)
+@router.post("/extractions/{extraction_id:anyuuid}/enhance", response_model=EnhanceExtractionResponse)
 async def enhance_extraction(
     extraction_id: UUID,
     request: EnhanceExtractionRequest,
+    x_cluster: Optional[str] = Header(None),
+    x_customer: Optional[str] = Header(None),
+    x_material_type: Optional[str] = Header(None),
     extraction_service: ExtractionService = Depends(get_extraction_service)
 ):
     """
@@ -308,42 +368,11 @@ async def enhance_extraction(
     
     - **extraction_id**: UUID of the extraction to enhance
     - **request**: Request body containing data to enhance
+    - **X-Cluster / X-Customer / X-Material-Type**: Optional hints with the values sent on
+      upload; when all three are given the Redis lookup runs alongside the database read
     - Returns the same data object from the request body plus Redis table results
     """
     try:
-        # Get the extraction record - it should always exist with cluster, customer, material_type
-        extraction = await extraction_service.get_extraction_by_id(extraction_id)
-        
-        if not extraction:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Extraction {extraction_id} not found"
-            )
-        
-        # Debug: Show all extraction fields
-        print(f"Extraction record found:")
-        print(f"  - ID: {extraction.id}")
-        print(f"  - cluster: '{extraction.cluster}'")
-        print(f"  - customer: '{extraction.customer}'")
-        print(f"  - material_type: '{extraction.material_type}'")
-        print(f"  - status: '{extraction.status}'")
-        print(f"  - current_step: '{extraction.current_step}'")
-        print(f"  - created_at: {extraction.created_at}")
-        
-        # Use the parameters from the extraction record
-        cluster = extraction.cluster
-        customer = extraction.customer  
-        material_type = extraction.material_type
-        
-        # Validate that we have the required parameters
-        if not cluster or not customer or not material_type:
-            print(f"WARNING: Extraction record missing required fields!")
-            print(f"  - cluster: {'✓' if cluster else '✗'} '{cluster}'")
-            print(f"  - customer: {'✓' if customer else '✗'} '{customer}'")
-            print(f"  - material_type: {'✓' if material_type else '✗'} '{material_type}'")
-        
-        print(f"Using extraction record parameters - Cluster: {cluster}, Customer: {customer}, Material Type: {material_type}")
-        
         # Extract parameters from target_mappings in the request data
         supplier_name = None
         short_code = None  # Material Sub Group -> short_code
@@ -365,16 +394,15 @@ async def enhance_extraction(
                 elif field == 'material description':
                     material_group = value
         
-        print(f"Extracted parameters from target_mappings:")
-        print(f"  - supplier_name: '{supplier_name}'")
-        print(f"  - short_code (Material Sub Group): '{short_code}'")
-        print(f"  - fabric_content_code_description (Composition): '{fabric_content_code_description}'")
-        print(f"  - material_group (Material Description): '{material_group}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Enhancement parameters: supplier_name=%r short_code=%r "
+                "fabric_content_code_description=%r material_group=%r",
+                supplier_name, short_code, fabric_content_code_description, material_group
+            )
         
-        # Fetch Redis table results if we have the required parameters
-        redis_data = None
-        if cluster and customer and material_type:
-            redis_data = extraction_service.get_all_table_results_from_redis(
+        def fetch_redis_data(cluster: str, customer: str, material_type: str):
+            return extraction_service.get_all_table_results_from_redis(
                 cluster=cluster,
                 customer=customer,
                 material_type=material_type,
@@ -383,9 +411,56 @@ async def enhance_extraction(
                 fabric_content_code_description=fabric_content_code_description,
                 material_group=material_group
             )
-            print(f"Redis lookup successful: found {len(redis_data.get('customers', []))} customers, {len(redis_data.get('suppliers', []))} suppliers, {len(redis_data.get('material_security_groups', []))} security groups, {len(redis_data.get('material_groups', []))} material groups, {len(redis_data.get('composition', []))} compositions, {len(redis_data.get('fabric_contents', []))} fabric contents" if redis_data else "Redis lookup returned no data")
+        
+        # Get the extraction's context - it should always exist with cluster, customer, material_type.
+        # With hints from the client the Redis lookup does not have to wait for it
+        hinted = (x_cluster, x_customer, x_material_type)
+        redis_data = None
+        if all(hinted):
+            extraction, redis_data = await asyncio.gather(
+                extraction_service.get_extraction_context(extraction_id),
+                fetch_redis_data(*hinted)
+            )
         else:
-            print(f"Missing required parameters for Redis lookup: cluster={cluster}, customer={customer}, material_type={material_type}")
+            extraction = await extraction_service.get_extraction_context(extraction_id)
+        
+        if not extraction:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Extraction {extraction_id} not found"
+            )
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Extraction %s found: cluster=%r customer=%r material_type=%r status=%r current_step=%r",
+                extraction_id, extraction.cluster, extraction.customer, extraction.material_type,
+                extraction.status, extraction.current_step
+            )
+        
+        # Use the parameters from the extraction record
+        cluster = extraction.cluster
+        customer = extraction.customer  
+        material_type = extraction.material_type
+        
+        # Validate that we have the required parameters
+        if not cluster or not customer or not material_type:
+            logger.warning(
+                "Extraction %s missing required fields: cluster=%r customer=%r material_type=%r",
+                extraction_id, cluster, customer, material_type
+            )
+        
+        # The record is authoritative; hints that disagree with it are discarded
+        if (cluster, customer, material_type) != hinted:
+            redis_data = None
+            if cluster and customer and material_type:
+                redis_data = await fetch_redis_data(cluster, customer, material_type)
+            else:
+                logger.debug(
+                    "Missing required parameters for Redis lookup: cluster=%r customer=%r material_type=%r",
+                    cluster, customer, material_type
+                )
+        if redis_data is None:
+            logger.debug("Redis lookup returned no data")
         
         # Prepare response message
         message = "Extraction enhancement completed successfully"
@@ -400,17 +475,17 @@ async def enhance_extraction(
         else:
             message += " (no Redis data available)"
         
-        # Log what we're returning
-        print(f"Returning target data fields: {list(request.data.keys())}")
-        print(f"Redis data available: {redis_data is not None}")
-        if redis_data:
-            print(f"Redis data contains: {list(redis_data.keys())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Returning target data fields %s with Redis data %s",
+                list(request.data.keys()), list(redis_data.keys()) if redis_data else None
+            )
         
         # Process LLM enhancement with target mappings and Redis data
         llm_enhancement_response = None
         try:
             target_mappings = request.data.get('target_mappings', [])
-            print(f"Calling LLM enhancement with {len(target_mappings)} target mappings and Redis data")
+            logger.debug("Calling LLM enhancement with %d target mappings", len(target_mappings))
             
             llm_enhancement_response = await process_content_enhancement(
                 target_mappings=target_mappings,
@@ -418,16 +493,18 @@ async def enhance_extraction(
             )
             
             if llm_enhancement_response.get("status") == "success":
-                stats = llm_enhancement_response.get("enhancement_stats", {})
-                print(f"LLM enhancement completed successfully:")
-                print(f"  - Total fields: {llm_enhancement_response.get('total_fields', 0)}")
-                print(f"  - Original: {stats.get('original', 0)}")
-                print(f"  - Enhanced: {stats.get('enhanced', 0)}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    stats = llm_enhancement_response.get("enhancement_stats", {})
+                    logger.debug(
+                        "LLM enhancement completed: total_fields=%s original=%s enhanced=%s",
+                        llm_enhancement_response.get("total_fields", 0),
+                        stats.get("original", 0), stats.get("enhanced", 0)
+                    )
             else:
-                print(f"LLM enhancement had issues: {llm_enhancement_response.get('status')}")
+                logger.warning("LLM enhancement had issues: %s", llm_enhancement_response.get("status"))
                 
         except Exception as e:
-            print(f"LLM enhancement failed: {e}")
+            logger.exception("LLM enhancement failed")
             llm_enhancement_response = {
                 "status": "error",
                 "error": str(e),
@@ -436,13 +513,15 @@ async def enhance_extraction(
                 "total_fields": 0
             }
         
-        return EnhanceExtractionResponse(
-            extraction_id=extraction_id,
-            message=message,
-            data=request.data,  # ✅ Original target data from request
-            redis_data=redis_data,  # ✅ Related Redis data (customers, suppliers, material_security_groups)
-            llm_enhancement=llm_enhancement_response  # ✅ LLM enhancement response
-        )
+        # Returned as-is so orjson encodes the large Redis payload directly; response_model
+        # still documents the shape but skips re-validating and re-encoding it
+        return ORJSONResponse({
+            "extraction_id": extraction_id,
+            "message": message,
+            "data": request.data,  # ✅ Original target data from request
+            "redis_data": redis_data,  # ✅ Related Redis data (customers, suppliers, material_security_groups)
+            "llm_enhancement": llm_enhancement_response  # ✅ LLM enhancement response
+        })
         
     except HTTPException:
         raise
@@ -453,96 +532,182 @@ async def enhance_extraction(
         )
 
 
-@router.get("/extractions/")
-async def list_extractions(
-    limit: Optional[int] = Query(10, description="Number of extractions to return"),
-    offset: Optional[int] = Query(0, description="Number of extractions to skip"),
-    extraction_service: ExtractionService = Depends(get_extraction_service)
-):
-    """
-    List extractions for debugging purposes
-    
-    - **limit**: Maximum number of extractions to return (default: 10)
-    - **offset**: Number of extractions to skip (default: 0)
-    """
-    try:
-        extractions = await extraction_service.get_all_extractions(limit=limit, offset=offset)
-        
-        # Debug: Check if material_type attribute exists and database schema
-        if extractions:
-            sample_extraction = extractions[0]
-            print(f"Sample extraction attributes: {dir(sample_extraction)}")
-            print(f"Has material_type attribute: {hasattr(sample_extraction, 'material_type')}")
-            if hasattr(sample_extraction, 'material_type'):
-                print(f"material_type value: '{sample_extraction.material_type}'")
-            
-            # Check database schema for material_type column
-            try:
-                from sqlalchemy import text
-                session = extraction_service.session
-                schema_check = await session.execute(text("""
-                    SELECT column_name, data_type, is_nullable 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'extractions' 
-                    AND column_name = 'material_type'
-                """))
-                column_info = schema_check.fetchall()
-                if column_info:
-                    print(f"material_type column exists: {column_info[0]}")
-                else:
-                    print("material_type column does NOT exist in database schema")
-            except Exception as e:
-                print(f"Error checking schema: {e}")
-        
-        # Create response with explicit field access
-        extraction_list = []
-        for extraction in extractions:
-            try:
-                extraction_data = {
-                    "id": str(extraction.id),
-                    "status": extraction.status,
-                    "current_step": extraction.current_step,
-                    "cluster": getattr(extraction, 'cluster', 'ATTR_NOT_FOUND'),
-                    "customer": getattr(extraction, 'customer', 'ATTR_NOT_FOUND'),
-                    "material_type": getattr(extraction, 'material_type', 'ATTR_NOT_FOUND'),
-                    "created_at": extraction.created_at,
-                    "document_id": str(extraction.document_id) if extraction.document_id else None,
-                    "has_required_fields": bool(extraction.cluster and extraction.customer and extraction.material_type)
-                }
-                print(f"Extraction {extraction.id}: cluster='{extraction.cluster}', customer='{extraction.customer}', material_type='{extraction.material_type}'")
-                extraction_list.append(extraction_data)
-            except Exception as e:
-                print(f"Error processing extraction {extraction.id}: {e}")
-                extraction_list.append({"id": str(extraction.id), "error": str(e)})
+async def _receive_extraction_commands(
+    websocket: WebSocket,
+    pubsub,
+    outbound: asyncio.Queue,
+    subscribed: asyncio.Event
+) -> None:
+    """Apply subscribe/unsubscribe commands from the client; anything else is echoed back"""
+    while True:
+        data = await websocket.receive_text()
+        try:
+            command = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            command = None
         
-        return {
-            "total_returned": len(extractions),
-            "extractions": extraction_list
-        }
+        if not isinstance(command, dict) or not ({"subscribe", "unsubscribe"} & command.keys()):
+            # Echo back the same message (simple response)
+            await outbound.put(f"Echo: {data}")
+            continue
         
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list extractions: {str(e)}"
-    )
+        action = "subscribe" if "subscribe" in command else "unsubscribe"
+        try:
+            channel = extraction_status_channel(UUID(str(command[action])))
+        except ValueError:
+            await outbound.put(orjson.dumps({"error": f"Invalid extraction id: {command[action]}"}).decode())
+            continue
+        if pubsub is None:
+            await outbound.put(orjson.dumps({"error": "Status updates are unavailable"}).decode())
+            continue
+        
+        if action == "subscribe":
+            await pubsub.subscribe(channel)
+            subscribed.set()
+        else:
+            await pubsub.unsubscribe(channel)
+
+
+async def _forward_extraction_statuses(pubsub, outbound: asyncio.Queue, subscribed: asyncio.Event) -> None:
+    """Queue status messages published for the subscribed extractions"""
+    # The pub/sub connection only exists after the first subscribe
+    await subscribed.wait()
+    while True:
+        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+        if message is not None:
+            await outbound.put(message["data"].decode("utf-8"))
+
+
+async def _send_outbound(websocket: WebSocket, outbound: asyncio.Queue) -> None:
+    """Drain the outbound queue to the client one message at a time"""
+    while True:
+        await websocket.send_text(await outbound.get())
 
 
 @router.websocket("/extractions/ws")
 async def extraction_websocket(websocket: WebSocket):
     """
     WebSocket endpoint for real-time extraction updates
+    
+    Clients send {"subscribe": "<extraction_id>"} or {"unsubscribe": "<extraction_id>"}
+    and receive every status change published for subscribed extractions; other text
+    is echoed back. Receiving, forwarding and sending run concurrently, and the bounded
+    outbound queue makes a slow client hold back the forwarder instead of growing memory.
     """
     await websocket.accept()
     
+    outbound = asyncio.Queue(maxsize=WEBSOCKET_OUTBOUND_QUEUE_SIZE)
+    subscribed = asyncio.Event()
+    pubsub = redis_client.pubsub() if is_redis_available() else None
+    tasks = [
+        asyncio.create_task(_receive_extraction_commands(websocket, pubsub, outbound, subscribed)),
+        asyncio.create_task(_send_outbound(websocket, outbound)),
+    ]
+    if pubsub is not None:
+        tasks.append(asyncio.create_task(_forward_extraction_statuses(pubsub, outbound, subscribed)))
+    
     try:
-        while True:
-            # Receive message from client
-            data = await websocket.receive_text()
+        # Any task ending means the connection is done; surface its error if it had one
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
             
-            # Echo back the same message (simple response)
-            await websocket.send_text(f"Echo: {data}")
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("WebSocket error")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if pubsub is not None:
+            if subscribed.is_set():
+                await pubsub.unsubscribe()
+            await pubsub.aclose()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            # Already closed by the client
+            pass
+
+
+async def _send_statuses_until_final(websocket: WebSocket, pubsub) -> None:
+    """Send the status changes published for one extraction until it reaches a final status"""
+    async for message in pubsub.listen():
+        if message["type"] != "message":
+            continue
+        await websocket.send_text(message["data"].decode("utf-8"))
+        if orjson.loads(message["data"]).get("status") in EXTRACTION_FINAL_STATUSES:
+            return
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Return once the client disconnects; anything else it sends is ignored"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/extractions/{extraction_id:anyuuid}/ws")
+async def extraction_status_websocket(websocket: WebSocket, extraction_id: UUID):
+    """
+    WebSocket endpoint pushing status changes of one extraction until it finishes processing
+    
+    Listening races the client's receive so a disconnect releases the pub/sub connection
+    at once, and gives up after EXTRACTION_STATUS_WEBSOCKET_TIMEOUT for extractions that
+    never finish (for example after a restart).
+    """
+    await websocket.accept()
+    
+    pubsub = None
+    tasks = []
+    try:
+        # Subscribe before reading the current status so no change is missed in between
+        if is_redis_available():
+            pubsub = redis_client.pubsub()
+            await pubsub.subscribe(extraction_status_channel(extraction_id))
+        
+        async with AsyncSessionLocal() as session:
+            extraction = await ExtractionService(session).get_extraction_status(extraction_id)
+        if not extraction:
+            await websocket.send_json({"extraction_id": str(extraction_id), "error": "Extraction not found"})
+            return
+        
+        await websocket.send_json({
+            "extraction_id": str(extraction_id),
+            "status": extraction.status,
+            "current_step": extraction.current_step
+        })
+        if extraction.status in EXTRACTION_FINAL_STATUSES or pubsub is None:
+            return
+        
+        tasks = [
+            asyncio.create_task(_send_statuses_until_final(websocket, pubsub)),
+            asyncio.create_task(_wait_for_disconnect(websocket)),
+        ]
+        # A final status, a disconnect or the timeout ends the connection; surface any error
+        done, _ = await asyncio.wait(
+            tasks,
+            timeout=EXTRACTION_STATUS_WEBSOCKET_TIMEOUT,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            task.result()
             
-    except Exception as e:
-        print(f"WebSocket error: {e}")
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        logger.exception("WebSocket error")
     finally:
-        await websocket.close() 
\ No newline at end of file
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if pubsub is not None:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+        try:
+            await websocket.close()
+        except RuntimeError:
+            # Already closed by the client
+            pass
@@ -1,10 +1,19 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple, Type, TypeVar
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from apps.dociq.db import get_dociq_session
+from common.dependancies import keyset_cursor
+# Registers the "anyuuid" path convertor the routes below declare
+import common.convertors
 from apps.dociq.services.template_service import TemplateService
+from apps.dociq.llm.prompt_utils import invalidate_template_field_mappings
 from apps.dociq.schemas.template import (
     TemplateCreate, 
     TemplateRead, 
@@ -12,7 +21,45 @@ from apps.dociq.schemas.template import (
     TemplateBase
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Unique index on templates.name; violations of it are reported as a duplicate name
+TEMPLATE_NAME_CONSTRAINT = "templates_name_key"
+
+
+def _json_body_openapi(model: Type[BaseModel]) -> dict:
+    """OpenAPI request body for a route that validates the raw body itself"""
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+async def _parse_json_body(request: Request, model: Type[ModelT]) -> ModelT:
+    """Validate the raw request bytes in pydantic-core instead of json.loads -> dict -> model"""
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        )
+
+
+def _is_duplicate_name(error: IntegrityError) -> bool:
+    """Whether an IntegrityError was raised by templates_name_key rather than another constraint"""
+    # asyncpg's UniqueViolationError carries the constraint name; the DBAPI adapter wraps it
+    for orig in (error.orig, getattr(error.orig, "__cause__", None)):
+        constraint_name = getattr(orig, "constraint_name", None)
+        if constraint_name is not None:
+            return constraint_name == TEMPLATE_NAME_CONSTRAINT
+    return f'"{TEMPLATE_NAME_CONSTRAINT}"' in str(error.orig)
+
+
+def _duplicate_name_error(name: Optional[str]) -> HTTPException:
+    """400 response for a template name that is already taken"""
+    detail = f"Template with name '{name}' already exists" if name is not None else "Template name already exists"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
 
 async def get_template_service(session: AsyncSession = Depends(get_dociq_session)) -> TemplateService:
@@ -20,9 +67,14 @@ async def get_template_service(session: AsyncSession = Depends(get_dociq_session
     return TemplateService(session)
 
 
-@router.post("/templates", response_model=TemplateRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/templates",
+    response_model=TemplateRead,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_json_body_openapi(TemplateCreate)
+)
 async def create_template(
-    template_data: TemplateCreate,
+    request: Request,
     template_service: TemplateService = Depends(get_template_service)
 ):
     """
@@ -36,17 +88,19 @@ async def create_template(
     - **header_row**: Excel-specific: row number containing headers
     - **sheetname**: Excel-specific: sheet name
     """
-    # Check if template with same name already exists
-    existing_template = await template_service.get_template_by_name(template_data.name)
-    if existing_template:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Template with name '{template_data.name}' already exists"
-        )
+    template_data = await _parse_json_body(request, TemplateCreate)
     
     try:
         template = await template_service.create_template(template_data)
         return template
+    except IntegrityError as e:
+        # templates_name_key rejects a duplicate name atomically, without a SELECT first
+        if _is_duplicate_name(e):
+            raise _duplicate_name_error(template_data.name)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create template: {str(e)}"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,21 +116,25 @@ async def get_templates(
     limit: int = 100,
     category: Optional[str] = None,
     template_type: Optional[str] = None,
+    cursor: Optional[Tuple[datetime, UUID]] = Depends(keyset_cursor),
     template_service: TemplateService = Depends(get_template_service)
 ):
     """
-    Get all templates with optional filtering
+    Get all templates with optional filtering, newest first
     
     - **skip**: Number of records to skip for pagination
     - **limit**: Maximum number of records to return
     - **category**: Filter by category
     - **template_type**: Filter by template type (pdf or excel)
+    - **after**: Keyset cursor built from the created_at and id of the last template
+      already received; takes precedence over skip
     """
     templates = await template_service.get_templates(
         skip=skip, 
         limit=limit, 
         category=category, 
-        template_type=template_type
+        template_type=template_type,
+        after=cursor
     )
     
     # Add security headers to prevent mixed content
@@ -90,7 +148,7 @@ async def get_templates(
     return templates
 
 
-@router.get("/templates/{template_id}", response_model=TemplateRead)
+@router.get("/templates/{template_id:anyuuid}", response_model=TemplateRead)
 async def get_template(
     template_id: UUID,
     template_service: TemplateService = Depends(get_template_service)
@@ -107,25 +165,36 @@ async def get_template(
     return template
 
 
-@router.put("/templates/{template_id}", response_model=TemplateRead)
+@router.put(
+    "/templates/{template_id:anyuuid}",
+    response_model=TemplateRead,
+    openapi_extra=_json_body_openapi(TemplateUpdate)
+)
 async def update_template(
     template_id: UUID,
-    template_data: TemplateUpdate,
+    request: Request,
     template_service: TemplateService = Depends(get_template_service)
 ):
     """
     Update an existing template
     """
-    template = await template_service.update_template(template_id, template_data)
+    template_data = await _parse_json_body(request, TemplateUpdate)
+    try:
+        template = await template_service.update_template(template_id, template_data)
+    except IntegrityError as e:
+        if _is_duplicate_name(e):
+            raise _duplicate_name_error(template_data.name)
+        raise
     if not template:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Template with ID {template_id} not found"
         )
+    await invalidate_template_field_mappings(template_id)
     return template
 
 
-@router.delete("/templates/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/templates/{template_id:anyuuid}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_template(
     template_id: UUID,
     template_service: TemplateService = Depends(get_template_service)
@@ -138,4 +207,5 @@ async def delete_template(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Template with ID {template_id} not found"
-        ) 
\ No newline at end of file
+        )
+    await invalidate_template_field_mappings(template_id)
\ No newline at end of file
@@ -1,9 +1,15 @@
-from typing import Optional, List, Literal
+from enum import Enum
+from typing import Optional, List
 from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel, ConfigDict
 
 
+class TemplateType(str, Enum):
+    PDF = "pdf"
+    EXCEL = "excel"
+
+
 class FieldMappingSchema(BaseModel):
     target_field: str
     sample_field_names: List[str]
@@ -16,7 +22,7 @@ class FieldMappingSchema(BaseModel):
 
 class TemplateBase(BaseModel):
     name: str
-    type: Literal["pdf", "excel"]
+    type: TemplateType
     category: str
     description: Optional[str] = None
     status: Optional[str] = "active"
@@ -26,7 +32,8 @@ class TemplateBase(BaseModel):
     header_row: Optional[int] = None
     sheetname: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    # Dump the plain string so template rows keep storing "pdf"/"excel"
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class TemplateCreate(TemplateBase):
@@ -35,7 +42,7 @@ class TemplateCreate(TemplateBase):
 
 class TemplateUpdate(BaseModel):
     name: Optional[str] = None
-    type: Optional[Literal["pdf", "excel"]] = None
+    type: Optional[TemplateType] = None
     category: Optional[str] = None
     description: Optional[str] = None
     status: Optional[str] = None
@@ -43,7 +50,7 @@ class TemplateUpdate(BaseModel):
     header_row: Optional[int] = None
     sheetname: Optional[str] = None
 
-    model_config = ConfigDict(from_attributes=True)
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
 
 
 class TemplateRead(TemplateBase):
@@ -1,53 +1,266 @@
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict, BinaryIO
 import uuid
 import asyncio
-import json
-from datetime import datetime
+import hashlib
+import logging
+import time
+import orjson
+from datetime import datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
-import os
-import shutil
+from sqlalchemy import func, select, text, tuple_, update
+from sqlalchemy.orm import joinedload
 from pathlib import Path
-import redis
+import aiofiles
+from fastapi import UploadFile
 
 from apps.dociq.models.document import Document
 from apps.dociq.models.extraction import Extraction
 from apps.dociq.llm.prompt_utils import process_content_mapping
 from apps.dociq.db import AsyncSessionLocal
-from common.utils.parser import parse_with_mistral_from_bytes
+from apps.dociq.redis_client import redis_client, is_redis_available
+from common.utils.parser import parse_with_mistral_from_bytes, MISTRAL_OCR_MODEL
+
+logger = logging.getLogger(__name__)
 
 # Configure upload directory
 UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
 
-# Configure Redis connection with environment variable fallbacks
-REDIS_HOST = os.getenv('REDIS_HOST', 'big-bear-redis')
-REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
-REDIS_USERNAME = os.getenv('REDIS_USERNAME', 'default')
-REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', '12345')
-
-try:
-    REDIS_CLIENT = redis.Redis(
-        host=REDIS_HOST,
-        port=REDIS_PORT,
-        username=REDIS_USERNAME,
-        password=REDIS_PASSWORD,
-        decode_responses=False,  # Keep as bytes for file storage
-        socket_connect_timeout=5,
-        socket_timeout=5
-    )
-    # Test the connection
-    REDIS_CLIENT.ping()
-    REDIS_AVAILABLE = True
-    print(f"Redis connection established successfully to {REDIS_HOST}:{REDIS_PORT}")
-except Exception as e:
-    print(f"Redis connection failed: {e}")
-    print("Files will only be saved to disk")
-    REDIS_AVAILABLE = False
-    REDIS_CLIENT = None
+# Mistral markdown is written here as {document_id}.md for the mapping step to read back
+OUTPUT_DIR = Path("outputs")
+OUTPUT_DIR.mkdir(exist_ok=True)
+
+# Uploads are streamed to disk in chunks of this size so memory stays bounded
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Mistral markdown is cached by the SHA-256 of the uploaded bytes, so re-uploading
+# the same document skips OCR
+EXTRACTION_CACHE_TTL = 7 * 86400
+
+# Document type stored for each uploaded file extension (without the leading dot)
+DOCUMENT_TYPES = {
+    'pdf': 'pdf',
+    'xlsx': 'excel',
+    'xls': 'excel',
+    'doc': 'doc',
+    'docx': 'docx',
+    'txt': 'txt',
+    'jpg': 'image',
+    'jpeg': 'image',
+    'png': 'image',
+    'gif': 'image',
+}
+
+# Reference tables read back for enhancement are kept in-process per (cluster, customer,
+# material_type); writers publish on TABLE_CACHE_INVALIDATION_PREFIX + cluster so every
+# worker drops its copy before the TTL runs out
+TABLE_RESULTS_LOCAL_TTL = 60
+TABLE_RESULTS_LOCAL_MAXSIZE = 1024
+TABLE_CACHE_INVALIDATION_PREFIX = "invalidate:"
+_table_results_local: Dict[Tuple[str, str, str], Tuple[float, Tuple[dict, List[Tuple[str, dict]]]]] = {}
+
+# Mistral runs in-process as a background task, so a restart during extraction leaves the
+# row queued or processing for good; recover_interrupted_extractions fails rows left that
+# way for longer than this many seconds (older than any extraction still running elsewhere),
+# checking every EXTRACTION_RECOVERY_INTERVAL seconds
+EXTRACTION_STALE_AFTER = 30 * 60
+EXTRACTION_RECOVERY_INTERVAL = 5 * 60
+
+# Statuses in which outputs/{document_id}.md exists, so the extraction can be mapped;
+# "mapped" is kept so an extraction can be re-mapped after a template change
+MAPPABLE_STATUSES = frozenset({"extracted", "mapped"})
+
+# Reference tables read by the header-driven background task. They are loaded outside this
+# app, so load_reference_tables records which exist once at startup; None means not checked
+# yet, and every query is attempted
+REFERENCE_TABLES = ("customers", "suppliers", "material_security_group", "material_groups", "composition", "fabric_contents")
+_reference_tables: Optional[frozenset] = None
+
+# Names the reference tables are stored under in Redis, as db_query:...:{timestamp}:{name}
+STORED_TABLE_NAMES = ("customers", "supplier", "material_security_group", "material_groups", "composition", "fabric_contents")
+
+# Reference table rows are fetched from the server-side cursor in batches of this size
+ROW_STREAM_PARTITION_SIZE = 1000
+
+# Dates and times keep the str() form the reference table rows were always stored in,
+# instead of orjson's native ISO 8601 output
+ROW_JSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+
+async def load_reference_tables() -> None:
+    """Record which reference tables exist, so background tasks never query a missing one"""
+    global _reference_tables
+    try:
+        rows = await _fetch_rows(
+            text("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' AND table_name = ANY(:names)"),
+            {"names": list(REFERENCE_TABLES)}
+        )
+    except Exception:
+        logger.exception("Could not check reference tables; every query will be attempted")
+        return
+    _reference_tables = frozenset(row["table_name"] for row in rows)
+    missing = [table for table in REFERENCE_TABLES if table not in _reference_tables]
+    if missing:
+        logger.warning("Reference tables missing, their lookups are skipped: %s", ", ".join(missing))
+
+
+async def _fail_stale_extractions() -> None:
+    """Mark extractions queued or processing for longer than EXTRACTION_STALE_AFTER as failed"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Extraction)
+            .where(
+                Extraction.status.in_(("queued", "processing")),
+                Extraction.updated_at < func.now() - timedelta(seconds=EXTRACTION_STALE_AFTER)
+            )
+            .values(status="extraction_failed", current_step="extraction_failed")
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    
+    if result.rowcount:
+        logger.warning("Marked %d interrupted extractions as extraction_failed", result.rowcount)
+
+
+async def recover_interrupted_extractions() -> None:
+    """
+    Mark extractions whose background Mistral task was lost to a restart as failed (run as a
+    background task for the life of the app)
+
+    Rows still queued or processing EXTRACTION_STALE_AFTER seconds after their last status
+    change get extraction_failed, so clients stop waiting and can upload the document again.
+    """
+    while True:
+        try:
+            await _fail_stale_extractions()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error recovering interrupted extractions")
+        await asyncio.sleep(EXTRACTION_RECOVERY_INTERVAL)
+
+
+async def _fetch_reference_rows(table_name: str, query, params: Optional[dict] = None) -> List[dict]:
+    """_fetch_rows for a reference table, without a round-trip if startup found no such table"""
+    if _reference_tables is not None and table_name not in _reference_tables:
+        return []
+    return await _fetch_rows(query, params)
+
+
+def _table_rows_or_empty(table_name: str, result) -> List[dict]:
+    """Rows of one gathered reference table query, or [] (logged) if the query raised"""
+    if isinstance(result, Exception):
+        logger.warning("%s query failed: %s", table_name, result)
+        return []
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s table: %d rows retrieved", table_name, len(result))
+        # Show first 3 rows
+        for i, row in enumerate(result[:3]):
+            logger.debug("  %s %d: %s", table_name, i + 1, row)
+        if len(result) > 3:
+            logger.debug("  ... and %d more rows", len(result) - 3)
+    return result
+
+
+def _rows_to_json(rows: List[dict]) -> bytes:
+    """Serialize reference table rows; non-JSON column types (dates, decimals, ...) are written as str()"""
+    return orjson.dumps(rows, default=str, option=ROW_JSON_OPTIONS)
+
+
+def _table_results_index_key(cluster: str, customer: str, material_type: str) -> str:
+    """Sorted set of stored table result timestamps, scored by epoch seconds, newest last"""
+    return f"db_query_idx:{cluster}:{customer}:{material_type}"
+
+
+def extraction_status_channel(extraction_id: uuid.UUID) -> str:
+    """Redis pub/sub channel carrying status changes of one extraction"""
+    return f"extraction:{extraction_id}:status"
+
+
+def _copy_and_hash(source: BinaryIO, file_path: Path) -> Tuple[int, str]:
+    """Copy a spooled upload to file_path in UPLOAD_CHUNK_SIZE chunks, returning its size and SHA-256"""
+    source.seek(0)
+    file_size = 0
+    digest = hashlib.sha256()
+    with open(file_path, "wb") as buffer:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            buffer.write(chunk)
+            digest.update(chunk)
+            file_size += len(chunk)
+    return file_size, digest.hexdigest()
+
+
+async def _fetch_rows(query, params: Optional[dict] = None) -> List[dict]:
+    """
+    Run one read-only query in its own session, so concurrent callers use separate connections
+
+    Rows are streamed through a server-side cursor ROW_STREAM_PARTITION_SIZE at a time and
+    turned into plain dicts per partition, so the full result is never held as Row objects
+    and dicts at the same time.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(query, params)
+        rows = []
+        async for partition in result.mappings().partitions(ROW_STREAM_PARTITION_SIZE):
+            rows.extend(dict(row) for row in partition)
+        return rows
+
+
+def _get_local_table_results(key: Tuple[str, str, str]) -> Optional[Tuple[dict, List[Tuple[str, dict]]]]:
+    """Return parsed reference tables from the in-process cache if still fresh"""
+    entry = _table_results_local.get(key)
+    if entry is None:
+        return None
+    expires_at, snapshot = entry
+    if expires_at < time.monotonic():
+        del _table_results_local[key]
+        return None
+    return snapshot
+
+
+def _set_local_table_results(key: Tuple[str, str, str], snapshot: Tuple[dict, List[Tuple[str, dict]]]) -> None:
+    """Store parsed reference tables in the in-process cache, evicting the oldest entry when full"""
+    _table_results_local.pop(key, None)
+    if len(_table_results_local) >= TABLE_RESULTS_LOCAL_MAXSIZE:
+        del _table_results_local[next(iter(_table_results_local))]
+    _table_results_local[key] = (time.monotonic() + TABLE_RESULTS_LOCAL_TTL, snapshot)
+
+
+def invalidate_table_results_cache(cluster: str) -> None:
+    """Drop every in-process reference table entry for a cluster"""
+    for key in [key for key in _table_results_local if key[0] == cluster]:
+        del _table_results_local[key]
+
+
+async def listen_for_table_cache_invalidation() -> None:
+    """
+    Consume invalidation messages published by any worker and drop the matching
+    in-process reference tables; runs until cancelled on shutdown
+    """
+    pubsub = redis_client.pubsub()
+    try:
+        await pubsub.psubscribe(f"{TABLE_CACHE_INVALIDATION_PREFIX}*")
+        async for message in pubsub.listen():
+            if message["type"] != "pmessage":
+                continue
+            channel = message["channel"].decode('utf-8')
+            invalidate_table_results_cache(channel[len(TABLE_CACHE_INVALIDATION_PREFIX):])
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("Table cache invalidation listener stopped: %s", e)
+    finally:
+        await pubsub.aclose()
+
+
+class ExtractionNotReadyError(Exception):
+    """Raised when an extraction is mapped before Mistral has finished processing it"""
 
 
 class ExtractionService:
+    # One instance per request holding only the session, so skip the per-instance __dict__
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
     
@@ -125,13 +338,10 @@ class ExtractionService:
             extraction_id: ID of the created extraction
             document_id: ID of the created document
         """
-        print(f"=== Background Task Processing ===")
-        print(f"Cluster: {cluster}")
-        print(f"Customer: {customer}")
-        print(f"Material Type: {material_type}")
-        print(f"Extraction ID: {extraction_id}")
-        print(f"Document ID: {document_id}")
-        print(f"=== End Background Task ===")
+        logger.info(
+            "Background task for extraction %s (document %s): cluster=%r customer=%r material_type=%r",
+            extraction_id, document_id, cluster, customer, material_type
+        )
         
         # Run concurrent queries to database tables
         await self._query_database_tables(cluster, customer, material_type)
@@ -154,177 +364,80 @@ class ExtractionService:
             material_type: Material type identifier
         """
         try:
-            # Create a new database session for this background task
-            async with AsyncSessionLocal() as session:
-                # First, let's check if the tables exist and have any data at all
-                try:
-                    # Check if tables exist and have data
-                    tables_check = await session.execute(text("SELECT table_name FROM information_schema.tables WHERE table_schema = 'public' AND table_name IN ('customers', 'supplier', 'material_security_group', 'material_groups', 'composition', 'fabric_contents')"))
-                    existing_tables = [row[0] for row in tables_check.fetchall()]
-                    print(f"Existing tables: {existing_tables}")
-                    
-                    for table in existing_tables:
-                        count_result = await session.execute(text(f"SELECT COUNT(*) FROM {table}"))
-                        count = count_result.scalar()
-                        print(f"Table '{table}' has {count} total records")
-                        
-                except Exception as e:
-                    print(f"Error checking tables: {e}")
-                
-                # Define the three concurrent queries with case insensitive partial matching
-                customers_query = text("""
-                    SELECT *
-                    FROM customers
-                    WHERE cluster ILIKE '%' || :cluster || '%'
-                      AND customer ILIKE '%' || :customer || '%'
-                """)
-                supplier_query = text("""
-                    SELECT *
-                    FROM suppliers
-                    WHERE cluster ILIKE '%' || :cluster || '%'
-                """)
-                material_security_group_query = text("""
-                    SELECT *
-                    FROM material_security_group
-                    WHERE cluster ILIKE '%' || :cluster || '%' 
-                      AND customer ILIKE '%' || :customer || '%'
-                      AND material_type ILIKE '%' || :material_type || '%'
-                """)
-                
-                # Add the three new table queries
-                material_groups_query = text("""
-                    SELECT * FROM material_groups
-                """)
-                composition_query = text("""
-                    SELECT * FROM composition
-                """)
-                fabric_contents_query = text("""
-                    SELECT * FROM fabric_contents
-                """)
-                
-                # Execute all six queries concurrently
-                print(f"Starting concurrent queries to database with material_type: {material_type}...")
-                print(f"Query parameters - cluster: '{cluster}', customer: '{customer}', material_type: '{material_type}'")
-                print("Executing queries with partial matching:")
-                print(f"  - customers: WHERE cluster ILIKE '%{cluster}%' AND customer ILIKE '%{customer}%'")
-                print(f"  - supplier: WHERE cluster ILIKE '%{cluster}%'")
-                print(f"  - material_security_group: WHERE cluster ILIKE '%{cluster}%' AND customer ILIKE '%{customer}%' AND material_type ILIKE '%{material_type}%'")
-                print("Executing queries for reference tables:")
-                print(f"  - material_groups: SELECT * FROM material_groups")
-                print(f"  - composition: SELECT * FROM composition") 
-                print(f"  - fabric_contents: SELECT * FROM fabric_contents")
-                
-                customers_task = session.execute(customers_query, {"cluster": cluster, "customer": customer})
-                supplier_task = session.execute(supplier_query, {"cluster": cluster})
-                material_security_group_task = session.execute(material_security_group_query, {"cluster": cluster, "customer": customer, "material_type": material_type})
-                material_groups_task = session.execute(material_groups_query)
-                composition_task = session.execute(composition_query)
-                fabric_contents_task = session.execute(fabric_contents_query)
-                
-                # Wait for all queries to complete
-                customers_result, supplier_result, material_security_group_result, material_groups_result, composition_result, fabric_contents_result = await asyncio.gather(
-                    customers_task,
-                    supplier_task,
-                    material_security_group_task,
-                    material_groups_task,
-                    composition_task,
-                    fabric_contents_task,
-                    return_exceptions=True
-                )
-                
-                # Process results and store in Redis
-                # print("=== Database Query Results ===")
-                
-                # Process customers result
-                if isinstance(customers_result, Exception):
-                    print(f"Customers query failed: {customers_result}")
-                    customers_rows = []
-                else:
-                    customers_rows = customers_result.fetchall()
-                    print(f"Customers table: {len(customers_rows)} rows retrieved")
-                    # Optionally print first few rows for debugging
-                    for i, row in enumerate(customers_rows[:3]):  # Show first 3 rows
-                        print(f"  Customer {i+1}: {dict(row._mapping)}")
-                    if len(customers_rows) > 3:
-                        print(f"  ... and {len(customers_rows) - 3} more rows")
-                
-                # Process supplier result
-                if isinstance(supplier_result, Exception):
-                    print(f"Supplier query failed: {supplier_result}")
-                    supplier_rows = []
-                else:
-                    supplier_rows = supplier_result.fetchall()
-                    print(f"Supplier table: {len(supplier_rows)} rows retrieved")
-                    # Optionally print first few rows for debugging
-                    for i, row in enumerate(supplier_rows[:3]):  # Show first 3 rows
-                        print(f"  Supplier {i+1}: {dict(row._mapping)}")
-                    if len(supplier_rows) > 3:
-                        print(f"  ... and {len(supplier_rows) - 3} more rows")
-                
-                # Process material_security_group result
-                if isinstance(material_security_group_result, Exception):
-                    print(f"Material security group query failed: {material_security_group_result}")
-                    material_security_group_rows = []
-                else:
-                    material_security_group_rows = material_security_group_result.fetchall()
-                    print(f"Material security group table: {len(material_security_group_rows)} rows retrieved")
-                    # Optionally print first few rows for debugging
-                    for i, row in enumerate(material_security_group_rows[:3]):  # Show first 3 rows
-                        print(f"  Material security group {i+1}: {dict(row._mapping)}")
-                    if len(material_security_group_rows) > 3:
-                        print(f"  ... and {len(material_security_group_rows) - 3} more rows")
-                
-                # Process material_groups result
-                if isinstance(material_groups_result, Exception):
-                    print(f"Material groups query failed: {material_groups_result}")
-                    material_groups_rows = []
-                else:
-                    material_groups_rows = material_groups_result.fetchall()
-                    print(f"Material groups table: {len(material_groups_rows)} rows retrieved")
-                    # Optionally print first few rows for debugging
-                    for i, row in enumerate(material_groups_rows[:3]):  # Show first 3 rows
-                        print(f"  Material group {i+1}: {dict(row._mapping)}")
-                    if len(material_groups_rows) > 3:
-                        print(f"  ... and {len(material_groups_rows) - 3} more rows")
-                
-                # Process composition result
-                if isinstance(composition_result, Exception):
-                    print(f"Composition query failed: {composition_result}")
-                    composition_rows = []
-                else:
-                    composition_rows = composition_result.fetchall()
-                    print(f"Composition table: {len(composition_rows)} rows retrieved")
-                    # Optionally print first few rows for debugging
-                    for i, row in enumerate(composition_rows[:3]):  # Show first 3 rows
-                        print(f"  Composition {i+1}: {dict(row._mapping)}")
-                    if len(composition_rows) > 3:
-                        print(f"  ... and {len(composition_rows) - 3} more rows")
-                
-                # Process fabric_contents result
-                if isinstance(fabric_contents_result, Exception):
-                    print(f"Fabric contents query failed: {fabric_contents_result}")
-                    fabric_contents_rows = []
-                else:
-                    fabric_contents_rows = fabric_contents_result.fetchall()
-                    print(f"Fabric contents table: {len(fabric_contents_rows)} rows retrieved")
-                    # Optionally print first few rows for debugging
-                    for i, row in enumerate(fabric_contents_rows[:3]):  # Show first 3 rows
-                        print(f"  Fabric content {i+1}: {dict(row._mapping)}")
-                    if len(fabric_contents_rows) > 3:
-                        print(f"  ... and {len(fabric_contents_rows) - 3} more rows")
-                
-                # Store results in Redis as hashmaps
-                await self._store_table_results_in_redis(
-                    cluster, customer, material_type,
-                    customers_rows, supplier_rows, material_security_group_rows,
-                    material_groups_rows, composition_rows, fabric_contents_rows
-                )
-                
-                # print("=== End Database Query Results ===")
-                
-        except Exception as e:
-            # print(f"Error querying database tables: {e}")
-            pass
+            # Each query runs in its own session on its own pooled connection, so Postgres
+            # executes them in parallel instead of one after another on a shared connection
+            # Define the three concurrent queries with case insensitive partial matching
+            customers_query = text("""
+                SELECT *
+                FROM customers
+                WHERE cluster ILIKE '%' || :cluster || '%'
+                  AND customer ILIKE '%' || :customer || '%'
+            """)
+            supplier_query = text("""
+                SELECT *
+                FROM suppliers
+                WHERE cluster ILIKE '%' || :cluster || '%'
+            """)
+            material_security_group_query = text("""
+                SELECT *
+                FROM material_security_group
+                WHERE cluster ILIKE '%' || :cluster || '%' 
+                  AND customer ILIKE '%' || :customer || '%'
+                  AND material_type ILIKE '%' || :material_type || '%'
+            """)
+            
+            # Add the three new table queries
+            material_groups_query = text("""
+                SELECT * FROM material_groups
+            """)
+            composition_query = text("""
+                SELECT * FROM composition
+            """)
+            fabric_contents_query = text("""
+                SELECT * FROM fabric_contents
+            """)
+            
+            # Execute all six queries concurrently
+            logger.debug(
+                "Querying reference tables: cluster=%r customer=%r material_type=%r",
+                cluster, customer, material_type
+            )
+            
+            customers_task = _fetch_reference_rows("customers", customers_query, {"cluster": cluster, "customer": customer})
+            supplier_task = _fetch_reference_rows("suppliers", supplier_query, {"cluster": cluster})
+            material_security_group_task = _fetch_reference_rows("material_security_group", material_security_group_query, {"cluster": cluster, "customer": customer, "material_type": material_type})
+            material_groups_task = _fetch_reference_rows("material_groups", material_groups_query)
+            composition_task = _fetch_reference_rows("composition", composition_query)
+            fabric_contents_task = _fetch_reference_rows("fabric_contents", fabric_contents_query)
+            
+            # Wait for all queries to complete
+            customers_result, supplier_result, material_security_group_result, material_groups_result, composition_result, fabric_contents_result = await asyncio.gather(
+                customers_task,
+                supplier_task,
+                material_security_group_task,
+                material_groups_task,
+                composition_task,
+                fabric_contents_task,
+                return_exceptions=True
+            )
+            
+            # Failed queries are logged and stored as empty results
+            customers_rows = _table_rows_or_empty("customers", customers_result)
+            supplier_rows = _table_rows_or_empty("supplier", supplier_result)
+            material_security_group_rows = _table_rows_or_empty("material_security_group", material_security_group_result)
+            material_groups_rows = _table_rows_or_empty("material_groups", material_groups_result)
+            composition_rows = _table_rows_or_empty("composition", composition_result)
+            fabric_contents_rows = _table_rows_or_empty("fabric_contents", fabric_contents_result)
+            
+            # Store results in Redis as hashmaps
+            await self._store_table_results_in_redis(
+                cluster, customer, material_type,
+                customers_rows, supplier_rows, material_security_group_rows,
+                material_groups_rows, composition_rows, fabric_contents_rows
+            )
+            
+        except Exception:
+            logger.exception("Error querying database tables")
 
     async def _store_table_results_in_redis(
         self, 
@@ -352,255 +465,142 @@ class ExtractionService:
             composition_rows: Results from composition table
             fabric_contents_rows: Results from fabric_contents table
         """
-        if not REDIS_AVAILABLE or not REDIS_CLIENT:
+        if not is_redis_available():
             return
             
         try:
+            # Every write is queued on one non-transactional pipeline and sent in a single round-trip
+            pipe = redis_client.pipeline(transaction=False)
+            
             # Create a unique key prefix for this query
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             key_prefix = f"db_query:{cluster}:{customer}:{material_type}:{timestamp}"
             
-            # Store customers table results
-            customers_hash_key = f"{key_prefix}:customers"
-            if customers_rows:
-                # Convert rows to clean JSON array
-                rows_data = []
-                for row in customers_rows:
-                    row_data = dict(row._mapping)
-                    # Convert non-serializable types to strings
-                    clean_row = {}
-                    for k, v in row_data.items():
-                        if v is None:
-                            clean_row[k] = None
-                        elif isinstance(v, (str, int, float, bool)):
-                            clean_row[k] = v
-                        else:
-                            clean_row[k] = str(v)
-                    rows_data.append(clean_row)
-                
-                # Store as clean JSON
-                REDIS_CLIENT.hset(customers_hash_key, "data", json.dumps(rows_data))
-                REDIS_CLIENT.hset(customers_hash_key, "metadata", json.dumps({
-                    "table_name": "customers",
-                    "row_count": len(customers_rows),
-                    "query_timestamp": timestamp,
-                    "query_params": {
-                        "cluster": cluster,
-                        "customer": customer,
-                        "material_type": material_type
-                    }
-                }))
-                
-                # Set expiration (24 hours)
-                REDIS_CLIENT.expire(customers_hash_key, 86400)
-            
-            # Store supplier table results
-            supplier_hash_key = f"{key_prefix}:supplier"
-            if supplier_rows:
-                # Convert rows to clean JSON array
-                rows_data = []
-                for row in supplier_rows:
-                    row_data = dict(row._mapping)
-                    # Convert non-serializable types to strings
-                    clean_row = {}
-                    for k, v in row_data.items():
-                        if v is None:
-                            clean_row[k] = None
-                        elif isinstance(v, (str, int, float, bool)):
-                            clean_row[k] = v
-                        else:
-                            clean_row[k] = str(v)
-                    rows_data.append(clean_row)
-                
-                # Store as clean JSON
-                REDIS_CLIENT.hset(supplier_hash_key, "data", json.dumps(rows_data))
-                REDIS_CLIENT.hset(supplier_hash_key, "metadata", json.dumps({
-                    "table_name": "supplier",
-                    "row_count": len(supplier_rows),
-                    "query_timestamp": timestamp,
-                    "query_params": {
-                        "cluster": cluster,
-                        "customer": customer,
-                        "material_type": material_type
-                    }
-                }))
-                
-                # Set expiration (24 hours)
-                REDIS_CLIENT.expire(supplier_hash_key, 86400)
-            
-            # Store material_security_group table results
-            msg_hash_key = f"{key_prefix}:material_security_group"
-            if material_security_group_rows:
-                # Convert rows to clean JSON array
-                rows_data = []
-                for row in material_security_group_rows:
-                    row_data = dict(row._mapping)
-                    # Convert non-serializable types to strings
-                    clean_row = {}
-                    for k, v in row_data.items():
-                        if v is None:
-                            clean_row[k] = None
-                        elif isinstance(v, (str, int, float, bool)):
-                            clean_row[k] = v
-                        else:
-                            clean_row[k] = str(v)
-                    rows_data.append(clean_row)
-                
-                # Store as clean JSON
-                REDIS_CLIENT.hset(msg_hash_key, "data", json.dumps(rows_data))
-                REDIS_CLIENT.hset(msg_hash_key, "metadata", json.dumps({
-                    "table_name": "material_security_group",
-                    "row_count": len(material_security_group_rows),
-                    "query_timestamp": timestamp,
-                    "query_params": {
-                        "cluster": cluster,
-                        "customer": customer,
-                        "material_type": material_type
-                    }
-                }))
-                
-                # Set expiration (24 hours)
-                REDIS_CLIENT.expire(msg_hash_key, 86400)
-            
-            # Store material_groups table results
-            material_groups_hash_key = f"{key_prefix}:material_groups"
-            if material_groups_rows:
-                # Convert rows to clean JSON array
-                rows_data = []
-                for row in material_groups_rows:
-                    row_data = dict(row._mapping)
-                    # Convert non-serializable types to strings
-                    clean_row = {}
-                    for k, v in row_data.items():
-                        if v is None:
-                            clean_row[k] = None
-                        elif isinstance(v, (str, int, float, bool)):
-                            clean_row[k] = v
-                        else:
-                            clean_row[k] = str(v)
-                    rows_data.append(clean_row)
-                
-                # Store as clean JSON
-                REDIS_CLIENT.hset(material_groups_hash_key, "data", json.dumps(rows_data))
-                REDIS_CLIENT.hset(material_groups_hash_key, "metadata", json.dumps({
-                    "table_name": "material_groups",
-                    "row_count": len(material_groups_rows),
-                    "query_timestamp": timestamp,
-                    "query_params": {
-                        "cluster": cluster,
-                        "customer": customer,
-                        "material_type": material_type
-                    }
-                }))
-                
-                # Set expiration (24 hours)
-                REDIS_CLIENT.expire(material_groups_hash_key, 86400)
-            
-            # Store composition table results
-            composition_hash_key = f"{key_prefix}:composition"
-            if composition_rows:
-                # Convert rows to clean JSON array
-                rows_data = []
-                for row in composition_rows:
-                    row_data = dict(row._mapping)
-                    # Convert non-serializable types to strings
-                    clean_row = {}
-                    for k, v in row_data.items():
-                        if v is None:
-                            clean_row[k] = None
-                        elif isinstance(v, (str, int, float, bool)):
-                            clean_row[k] = v
-                        else:
-                            clean_row[k] = str(v)
-                    rows_data.append(clean_row)
-                
-                # Store as clean JSON
-                REDIS_CLIENT.hset(composition_hash_key, "data", json.dumps(rows_data))
-                REDIS_CLIENT.hset(composition_hash_key, "metadata", json.dumps({
-                    "table_name": "composition",
-                    "row_count": len(composition_rows),
-                    "query_timestamp": timestamp,
-                    "query_params": {
-                        "cluster": cluster,
-                        "customer": customer,
-                        "material_type": material_type
-                    }
-                }))
-                
-                # Set expiration (24 hours)
-                REDIS_CLIENT.expire(composition_hash_key, 86400)
+            table_rows = dict(zip(STORED_TABLE_NAMES, (
+                customers_rows,
+                supplier_rows,
+                material_security_group_rows,
+                material_groups_rows,
+                composition_rows,
+                fabric_contents_rows
+            )))
+            query_params = {
+                "cluster": cluster,
+                "customer": customer,
+                "material_type": material_type
+            }
             
-            # Store fabric_contents table results
-            fabric_contents_hash_key = f"{key_prefix}:fabric_contents"
-            if fabric_contents_rows:
-                # Convert rows to clean JSON array
-                rows_data = []
-                for row in fabric_contents_rows:
-                    row_data = dict(row._mapping)
-                    # Convert non-serializable types to strings
-                    clean_row = {}
-                    for k, v in row_data.items():
-                        if v is None:
-                            clean_row[k] = None
-                        elif isinstance(v, (str, int, float, bool)):
-                            clean_row[k] = v
-                        else:
-                            clean_row[k] = str(v)
-                    rows_data.append(clean_row)
-                
-                # Store as clean JSON
-                REDIS_CLIENT.hset(fabric_contents_hash_key, "data", json.dumps(rows_data))
-                REDIS_CLIENT.hset(fabric_contents_hash_key, "metadata", json.dumps({
-                    "table_name": "fabric_contents",
-                    "row_count": len(fabric_contents_rows),
-                    "query_timestamp": timestamp,
-                    "query_params": {
-                        "cluster": cluster,
-                        "customer": customer,
-                        "material_type": material_type
-                    }
-                }))
-                
-                # Set expiration (24 hours)
-                REDIS_CLIENT.expire(fabric_contents_hash_key, 86400)
+            # Store each non-empty table as one hash holding data and metadata (24 hour expiry)
+            table_keys = {}
+            for table_name, rows in table_rows.items():
+                if not rows:
+                    continue
+                hash_key = f"{key_prefix}:{table_name}"
+                pipe.hset(hash_key, mapping={
+                    "data": _rows_to_json(rows),
+                    "metadata": orjson.dumps({
+                        "table_name": table_name,
+                        "row_count": len(rows),
+                        "query_timestamp": timestamp,
+                        "query_params": query_params
+                    })
+                })
+                pipe.expire(hash_key, 86400)
+                table_keys[table_name] = hash_key
             
             # Store a master key that lists all the table keys for this query
             master_key = f"{key_prefix}:master"
-            table_keys = {
-                "customers": customers_hash_key if customers_rows else None,
-                "supplier": supplier_hash_key if supplier_rows else None, 
-                "material_security_group": msg_hash_key if material_security_group_rows else None,
-                "material_groups": material_groups_hash_key if material_groups_rows else None,
-                "composition": composition_hash_key if composition_rows else None,
-                "fabric_contents": fabric_contents_hash_key if fabric_contents_rows else None
-            }
-            
-            print(f"Redis storage summary:")
-            print(f"  - customers_rows: {len(customers_rows)} -> hash_key: {customers_hash_key if customers_rows else 'None'}")
-            print(f"  - supplier_rows: {len(supplier_rows)} -> hash_key: {supplier_hash_key if supplier_rows else 'None'}")
-            print(f"  - material_security_group_rows: {len(material_security_group_rows)} -> hash_key: {msg_hash_key if material_security_group_rows else 'None'}")
-            print(f"  - material_groups_rows: {len(material_groups_rows)} -> hash_key: {material_groups_hash_key if material_groups_rows else 'None'}")
-            print(f"  - composition_rows: {len(composition_rows)} -> hash_key: {composition_hash_key if composition_rows else 'None'}")
-            print(f"  - fabric_contents_rows: {len(fabric_contents_rows)} -> hash_key: {fabric_contents_hash_key if fabric_contents_rows else 'None'}")
             
-            # Remove None values
-            table_keys = {k: v for k, v in table_keys.items() if v is not None}
-            print(f"  - Final table_keys: {table_keys}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for table_name, rows in table_rows.items():
+                    logger.debug("Storing %s: %d rows -> %s", table_name, len(rows), table_keys.get(table_name))
             
-            REDIS_CLIENT.hset(master_key, "query_info", json.dumps({
+            pipe.hset(master_key, "query_info", orjson.dumps({
                 "cluster": cluster,
                 "customer": customer,
                 "material_type": material_type,
                 "timestamp": timestamp,
                 "table_keys": table_keys
             }))
-            REDIS_CLIENT.expire(master_key, 86400)
+            pipe.expire(master_key, 86400)
             
-        except Exception as e:
-            # Silently handle Redis errors to not break the main flow
-            pass
+            # Index the timestamp so readers find the newest entry without KEYS; members older
+            # than the master TTL point at expired keys and are trimmed on the way
+            index_key = _table_results_index_key(cluster, customer, material_type)
+            now = time.time()
+            pipe.zadd(index_key, {timestamp: now})
+            pipe.zremrangebyscore(index_key, 0, now - 86400)
+            pipe.expire(index_key, 86400)
+            
+            # Newer tables supersede any cached copy in this and other workers
+            pipe.publish(f"{TABLE_CACHE_INVALIDATION_PREFIX}{cluster}", timestamp)
+            
+            await pipe.execute()
+            invalidate_table_results_cache(cluster)
+            
+        except Exception:
+            # Redis errors must not break the main flow
+            logger.exception("Error storing table results in Redis")
 
-    def get_table_results_from_redis(self, cluster: str, customer: str, material_type: str, timestamp: str = None, supplier_name: str = None, short_code: str = None, fabric_content_code_description: str = None, material_group: str = None):
+    async def _load_table_results(self, cluster: str, customer: str, material_type: str, timestamp: str = None) -> Optional[Tuple[dict, List[Tuple[str, dict]]]]:
+        """
+        Fetch the master entry and every table hash it lists, with data and metadata JSON-parsed
+        
+        The latest tables (no timestamp) are served from the in-process cache when fresh.
+        
+        Returns:
+            Tuple of (query_info, [(table_name, table_data), ...]) or None if not found
+        """
+        cache_key = (cluster, customer, material_type)
+        latest_requested = not timestamp
+        if latest_requested:
+            snapshot = _get_local_table_results(cache_key)
+            if snapshot is not None:
+                return snapshot
+            
+            # If no timestamp provided, take the newest one from the sorted-set index
+            latest = await redis_client.zrevrange(_table_results_index_key(cluster, customer, material_type), 0, 0)
+            if not latest:
+                return None
+            timestamp = latest[0].decode('utf-8')
+        
+        key_prefix = f"db_query:{cluster}:{customer}:{material_type}:{timestamp}"
+        
+        # Table hash keys follow from the prefix, so the master entry and every table hash
+        # it can list are fetched in one round trip; tables that were not stored come back empty
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hget(f"{key_prefix}:master", "query_info")
+            for table_name in STORED_TABLE_NAMES:
+                pipe.hgetall(f"{key_prefix}:{table_name}")
+            master_info, *table_hashes = await pipe.execute()
+        
+        if not master_info:
+            return None
+            
+        query_info = orjson.loads(master_info)
+        table_keys = query_info.get("table_keys", {})
+        hashes_by_key = {
+            f"{key_prefix}:{table_name}": table_hash
+            for table_name, table_hash in zip(STORED_TABLE_NAMES, table_hashes)
+        }
+        
+        tables = []
+        for table_name, hash_key in table_keys.items():
+            table_hash = hashes_by_key.get(hash_key)
+            if table_hash is None:
+                table_hash = await redis_client.hgetall(hash_key)
+            table_data = {}
+            for field, value in table_hash.items():
+                field = field.decode('utf-8')
+                table_data[field] = orjson.loads(value) if field in ("data", "metadata") else value.decode('utf-8')
+            tables.append((table_name, table_data))
+        
+        snapshot = (query_info, tables)
+        if latest_requested:
+            _set_local_table_results(cache_key, snapshot)
+        return snapshot
+
+    async def get_table_results_from_redis(self, cluster: str, customer: str, material_type: str, timestamp: str = None, supplier_name: str = None, short_code: str = None, fabric_content_code_description: str = None, material_group: str = None):
         """
         Retrieve database table results from Redis hashmaps
         
@@ -617,47 +617,29 @@ class ExtractionService:
         Returns:
             dict: Dictionary containing the table results or None if not found
         """
-        if not REDIS_AVAILABLE or not REDIS_CLIENT:
+        if not is_redis_available():
             return None
             
         try:
-            # If no timestamp provided, try to find keys with pattern
-            if not timestamp:
-                pattern = f"db_query:{cluster}:{customer}:{material_type}:*:master"
-                master_keys = REDIS_CLIENT.keys(pattern)
-                if not master_keys:
-                    return None
-                # Get the most recent one (keys are sorted by timestamp)
-                master_key = sorted(master_keys)[-1].decode('utf-8')
-            else:
-                master_key = f"db_query:{cluster}:{customer}:{material_type}:{timestamp}:master"
-            
-            # Get the master information
-            master_info = REDIS_CLIENT.hget(master_key, "query_info")
-            if not master_info:
+            snapshot = await self._load_table_results(cluster, customer, material_type, timestamp)
+            if snapshot is None:
                 return None
-                
-            query_info = json.loads(master_info.decode('utf-8'))
-            table_keys = query_info.get("table_keys", {})
+            query_info, tables = snapshot
             
             results = {
                 "query_info": query_info,
                 "tables": {}
             }
             
-            # Retrieve each table's data
-            for table_name, hash_key in table_keys.items():
-                table_data = REDIS_CLIENT.hgetall(hash_key)
+            # Filter each table's data
+            for table_name, table_data in tables:
                 if table_data:
-                    # Decode the data
-                    decoded_data = {k.decode('utf-8'): v.decode('utf-8') for k, v in table_data.items()}
-                    
                     # Extract data and metadata from new clean format
                     rows = []
                     metadata = {}
                     
-                    if "data" in decoded_data:
-                        rows = json.loads(decoded_data["data"])
+                    if "data" in table_data:
+                        rows = table_data["data"]
                         
                         # Filter suppliers data by supplier_name if provided
                         if table_name == "supplier" and supplier_name:
@@ -676,7 +658,7 @@ class ExtractionService:
                             material_group_dict = {}
                             
                             # First pass: Group all data by material_group (case-insensitive)
-                            print(f"Processing {len(rows)} material_groups records...")
+                            logger.debug("Processing %d material_groups records...", len(rows))
                             for row in rows:
                                 row_material_group = row.get('material_group', '')
                                 material_sub_group = row.get('material_sub_group', '')
@@ -694,7 +676,7 @@ class ExtractionService:
                                     if material_sub_group:
                                         material_group_dict[normalized_group]['sub_groups'].add(material_sub_group)
                             
-                            print(f"Grouped into {len(material_group_dict)} unique material_groups")
+                            logger.debug("Grouped into %d unique material_groups", len(material_group_dict))
                             
                             # Second pass: Find similar material_groups using semantic matching
                             filtered_sub_groups = set()
@@ -719,13 +701,11 @@ class ExtractionService:
                             # Convert to sorted list for consistent output
                             rows = sorted(list(filtered_sub_groups))
                             
-                            # Print the filtered results for debugging
-                            print(f"=== Material Groups Filter Results ===")
-                            print(f"Search term: '{material_group}'")
-                            print(f"Found {len(rows)} unique material_sub_groups:")
-                            for i, sub_group in enumerate(rows, 1):
-                                print(f"  {i}. {sub_group}")
-                            print(f"=== End Material Groups Results ===")
+                            # Log the filtered results for debugging
+                            logger.debug(
+                                "Material groups filter %r matched %d unique material_sub_groups: %s",
+                                material_group, len(rows), rows
+                            )
                         
                         # Handle material_groups data when no specific material_group filter is provided
                         elif table_name == "material_groups" and not material_group:
@@ -739,13 +719,11 @@ class ExtractionService:
                             # Return top 20 most common material groups (sorted alphabetically)
                             rows = sorted(list(unique_groups))[:20]
                             
-                            # Print the summary results for debugging
-                            print(f"=== Material Groups Summary ===")
-                            print(f"No specific material_group filter provided")
-                            print(f"Returning top {len(rows)} unique material_groups:")
-                            for i, group in enumerate(rows, 1):
-                                print(f"  {i}. {group}")
-                            print(f"=== End Material Groups Summary ===")
+                            # Log the summary results for debugging
+                            logger.debug(
+                                "No material_group filter provided, returning top %d unique material_groups: %s",
+                                len(rows), rows
+                            )
                         
                         # Filter fabric_contents data by fabric_content_code_description if provided
                         elif table_name == "fabric_contents" and fabric_content_code_description:
@@ -815,8 +793,9 @@ class ExtractionService:
                             
                             rows = final_records
                     
-                    if "metadata" in decoded_data:
-                        metadata = json.loads(decoded_data["metadata"])
+                    if "metadata" in table_data:
+                        # Copied because the cached metadata is shared across requests
+                        metadata = dict(table_data["metadata"])
                         
                         # Update metadata row count if data was filtered
                         if table_name == "supplier" and supplier_name:
@@ -855,7 +834,7 @@ class ExtractionService:
         except Exception as e:
             return None
 
-    def get_all_table_results_from_redis(self, cluster: str, customer: str, material_type: str, timestamp: str = None, supplier_name: str = None, short_code: str = None, fabric_content_code_description: str = None, material_group: str = None):
+    async def get_all_table_results_from_redis(self, cluster: str, customer: str, material_type: str, timestamp: str = None, supplier_name: str = None, short_code: str = None, fabric_content_code_description: str = None, material_group: str = None):
         """
         Retrieve all database table results (customers, suppliers, material_security_groups, material_groups, composition, fabric_contents) from Redis
         
@@ -873,12 +852,12 @@ class ExtractionService:
             dict: Dictionary containing all table results with keys 'customers', 'suppliers', 'material_security_groups', 'material_groups', 'composition', 'fabric_contents'
                   Returns None if no data found
         """
-        if not REDIS_AVAILABLE or not REDIS_CLIENT:
+        if not is_redis_available():
             return None
             
         try:
             # Get the full results using the existing method
-            redis_results = self.get_table_results_from_redis(cluster, customer, material_type, timestamp, supplier_name, short_code, fabric_content_code_description, material_group)
+            redis_results = await self.get_table_results_from_redis(cluster, customer, material_type, timestamp, supplier_name, short_code, fabric_content_code_description, material_group)
             
             if not redis_results or "tables" not in redis_results:
                 return None
@@ -926,9 +905,29 @@ class ExtractionService:
         except Exception as e:
             return None
 
+    async def save_upload(self, file: UploadFile) -> Tuple[Path, int, str]:
+        """
+        Stream an uploaded file to the upload directory chunk by chunk, hashing it on the way
+        
+        Args:
+            file: Uploaded file
+            
+        Returns:
+            Tuple of (saved file path, file size in bytes, SHA-256 hex digest)
+        """
+        # Create unique filename to avoid conflicts
+        unique_filename = f"{uuid.uuid4()}_{file.filename}"
+        file_path = UPLOAD_DIR / unique_filename
+        
+        # The whole copy runs in one worker thread rather than hopping to the thread pool
+        # for every chunk read and every chunk write
+        file_size, content_hash = await asyncio.to_thread(_copy_and_hash, file.file, file_path)
+        
+        return file_path, file_size, content_hash
+
     async def create_extraction_with_document(
         self, 
-        file_bytes: bytes, 
+        file_path: Path, 
         filename: str,
         file_size: int,
         cluster: Optional[str] = None,
@@ -936,10 +935,10 @@ class ExtractionService:
         material_type: Optional[str] = None
     ) -> Tuple[Extraction, Document]:
         """
-        Create a document and extraction record, process with Mistral
+        Create a document and extraction record; Mistral runs later in run_mistral_extraction
         
         Args:
-            file_bytes: Uploaded file bytes
+            file_path: Path the upload was streamed to by save_upload
             filename: Original filename
             file_size: File size in bytes
             cluster: Optional cluster identifier
@@ -952,9 +951,6 @@ class ExtractionService:
         # Determine document type from filename
         doc_type = self._get_document_type(filename)
         
-        # Save file to disk
-        file_path = self._save_file(file_bytes, filename)
-        
         # Create document record
         document = Document(
             doc_name=filename,
@@ -963,97 +959,151 @@ class ExtractionService:
             doc_path=str(file_path)
         )
         self.session.add(document)
-        await self.session.flush()  # Get the ID without committing
         
-        # Create extraction record
+        # Create extraction record; the id is generated client-side, so no flush is
+        # needed before the commit writes both rows
         extraction = Extraction(
             document_id=document.id,
             current_step="document_upload",
-            status="uploaded",
+            status="queued",
             cluster=cluster,
             customer=customer,
             material_type=material_type
         )
         self.session.add(extraction)
-        await self.session.flush()  # Get the ID without committing
         
-        # Process with Mistral
-        markdown_content = parse_with_mistral_from_bytes(file_bytes, filename)
+        # Commit both records
+        await self.session.commit()
+        
+        return extraction, document
+
+    async def run_mistral_extraction(
+        self,
+        extraction_id: uuid.UUID,
+        document_id: uuid.UUID,
+        file_path: Path,
+        filename: str,
+        content_hash: Optional[str] = None,
+        use_cache: bool = True
+    ) -> None:
+        """
+        Process an uploaded document with Mistral and record the outcome (run as a background task)
+        
+        Uses its own session because the request session is closed by the time background
+        tasks run. Status changes are written to the row and published on
+        extraction:{extraction_id}:status.
+        
+        Args:
+            extraction_id: UUID of the extraction created for the upload
+            document_id: UUID of the uploaded document
+            file_path: Path the upload was streamed to by save_upload
+            filename: Original filename
+            content_hash: SHA-256 of the uploaded bytes, used to reuse earlier Mistral results
+            use_cache: Whether a cached Mistral result may be used
+        """
+        await self._set_extraction_status(extraction_id, "processing", "document_upload")
+        
+        markdown_content = None
+        try:
+            # Reuse the markdown of an identical earlier upload when available
+            cache_key = f"extract:{MISTRAL_OCR_MODEL}:{content_hash}" if content_hash else None
+            if cache_key and use_cache:
+                markdown_content = await self._get_cached_extraction(cache_key)
+            
+            if markdown_content is None:
+                # Mistral needs the whole document, so read it back from disk only for this step
+                async with aiofiles.open(file_path, "rb") as f:
+                    file_bytes = await f.read()
+                
+                # The Mistral client is synchronous, so it runs off the event loop
+                markdown_content = await asyncio.to_thread(parse_with_mistral_from_bytes, file_bytes, filename)
+                del file_bytes
+                
+                if markdown_content and cache_key:
+                    await self._cache_extraction(cache_key, markdown_content)
+        except Exception:
+            logger.exception("Error processing document %s with Mistral", document_id)
+            markdown_content = None
         
         if markdown_content:
-            print("=" * 50)
-            print("MISTRAL PARSING RESULT:")
-            print("=" * 50)
-            print(markdown_content)
-            print("=" * 50)
+            # The full markdown is only formatted when debug logging is on
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Mistral parsing result for document %s:\n%s", document_id, markdown_content)
             
             # Save markdown content to a predictable location based on document ID
-            outputs_dir = Path("outputs")
-            outputs_dir.mkdir(exist_ok=True)
-            md_filename = f"{document.id}.md"
-            md_file_path = outputs_dir / md_filename
+            md_file_path = OUTPUT_DIR / f"{document_id}.md"
             
             try:
-                with open(md_file_path, 'w', encoding='utf-8') as f:
-                    f.write(markdown_content)
-                print(f"Markdown content saved to: {md_file_path}")
-            except Exception as e:
-                print(f"Error saving markdown content: {e}")
+                async with aiofiles.open(md_file_path, 'w', encoding='utf-8') as f:
+                    await f.write(markdown_content)
+                logger.info("Markdown content saved to: %s", md_file_path)
+            except Exception:
+                logger.exception("Error saving markdown content to %s", md_file_path)
             
-            # Update extraction status
-            extraction.status = "extracted"
-            extraction.current_step = "extraction_complete"
+            status, current_step = "extracted", "extraction_complete"
         else:
-            print("Mistral parsing failed or returned no content")
-            extraction.status = "extraction_failed"
-            extraction.current_step = "extraction_failed"
+            logger.warning("Mistral parsing failed or returned no content for document %s", document_id)
+            status, current_step = "extraction_failed", "extraction_failed"
         
-        # Commit both records
-        await self.session.commit()
-        await self.session.refresh(document)
-        await self.session.refresh(extraction)
+        await self._set_extraction_status(extraction_id, status, current_step)
+
+    async def _set_extraction_status(self, extraction_id: uuid.UUID, status: str, current_step: str) -> None:
+        """Persist an extraction status change and publish it for websocket subscribers"""
+        # Update extraction status in one statement, without loading the row first
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Extraction)
+                .where(Extraction.id == extraction_id)
+                .values(status=status, current_step=current_step)
+            )
+            await session.commit()
         
-        return extraction, document
+        await self._publish_extraction_status(extraction_id, status, current_step)
 
-    def _get_document_type(self, filename: str) -> str:
-        """Determine document type from filename extension"""
-        extension = filename.lower().split('.')[-1] if '.' in filename else ''
+    async def _publish_extraction_status(self, extraction_id: uuid.UUID, status: str, current_step: str) -> None:
+        """Publish an extraction status change for websocket subscribers"""
+        if not is_redis_available():
+            return
         
-        if extension in ['pdf']:
-            return 'pdf'
-        elif extension in ['xlsx', 'xls']:
-            return 'excel'
-        elif extension in ['doc', 'docx']:
-            return 'doc' if extension == 'doc' else 'docx'
-        elif extension in ['txt']:
-            return 'txt'
-        elif extension in ['jpg', 'jpeg', 'png', 'gif']:
-            return 'image'
-        else:
-            return 'pdf'  # Default to PDF
+        try:
+            await redis_client.publish(
+                extraction_status_channel(extraction_id),
+                orjson.dumps({
+                    "extraction_id": str(extraction_id),
+                    "status": status,
+                    "current_step": current_step
+                })
+            )
+        except Exception:
+            logger.exception("Error publishing extraction status")
 
-    def _save_file(self, file_bytes: bytes, filename: str) -> Path:
-        """Save uploaded file to disk and Redis"""
-        # Create unique filename to avoid conflicts
-        unique_filename = f"{uuid.uuid4()}_{filename}"
-        file_path = UPLOAD_DIR / unique_filename
+    async def _get_cached_extraction(self, cache_key: str) -> Optional[str]:
+        """Look up cached Mistral markdown for an upload's content hash"""
+        if not is_redis_available():
+            return None
         
-        # Save to disk
-        with open(file_path, "wb") as buffer:
-            buffer.write(file_bytes)
+        try:
+            cached = await redis_client.get(cache_key)
+        except Exception:
+            logger.exception("Error reading extraction cache")
+            return None
         
-        # Save to Redis
-        if REDIS_AVAILABLE and REDIS_CLIENT:
-            try:
-                redis_key = f"file:{unique_filename}"
-                REDIS_CLIENT.set(redis_key, file_bytes)
-                print(f"File saved to Redis with key: {redis_key}")
-            except Exception as e:
-                print(f"Error saving file to Redis: {e}")
-        else:
-            print(f"Redis not available, file '{unique_filename}' saved only to disk.")
+        return cached.decode('utf-8') if cached is not None else None
+
+    async def _cache_extraction(self, cache_key: str, markdown_content: str) -> None:
+        """Store Mistral markdown under an upload's content hash"""
+        if not is_redis_available():
+            return
         
-        return file_path
+        try:
+            await redis_client.set(cache_key, markdown_content, ex=EXTRACTION_CACHE_TTL)
+        except Exception:
+            logger.exception("Error caching extraction result")
+
+    def _get_document_type(self, filename: str) -> str:
+        """Determine document type from filename extension"""
+        extension = filename.rpartition('.')[2].lower()
+        return DOCUMENT_TYPES.get(extension, 'pdf')  # Default to PDF
 
     async def get_extraction_by_id(self, extraction_id: uuid.UUID) -> Optional[Extraction]:
         """Get extraction by ID"""
@@ -1062,11 +1112,56 @@ class ExtractionService:
         )
         return result.scalar_one_or_none()
 
-    async def get_all_extractions(self, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Extraction]:
-        """Get all extractions with optional pagination"""
-        query = select(Extraction).order_by(Extraction.created_at.desc())
+    async def get_extraction_context(self, extraction_id: uuid.UUID):
+        """
+        Get only the fields enhancement needs, without hydrating an Extraction instance
+        
+        Returns:
+            Row with cluster, customer, material_type, status and current_step, or None if not found
+        """
+        result = await self.session.execute(
+            select(
+                Extraction.cluster,
+                Extraction.customer,
+                Extraction.material_type,
+                Extraction.status,
+                Extraction.current_step
+            ).where(Extraction.id == extraction_id)
+        )
+        return result.one_or_none()
+
+    async def get_extraction_status(self, extraction_id: uuid.UUID):
+        """
+        Get only the status columns of an extraction, for status checks
+        
+        Returns:
+            Row with status and current_step, or None if not found
+        """
+        result = await self.session.execute(
+            select(Extraction.status, Extraction.current_step).where(Extraction.id == extraction_id)
+        )
+        return result.one_or_none()
+
+    async def get_all_extractions(
+        self,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None
+    ) -> List[Extraction]:
+        """
+        Get all extractions, newest first, with optional pagination
         
-        if offset is not None:
+        Args:
+            limit: Maximum number of extractions to return
+            offset: Number of extractions to skip (ignored when after is given)
+            after: (created_at, id) of the last extraction on the previous page; seeks
+                   through extractions_created_at_id_idx instead of scanning skipped rows
+        """
+        query = select(Extraction).order_by(Extraction.created_at.desc(), Extraction.id.desc())
+        
+        if after is not None:
+            query = query.where(tuple_(Extraction.created_at, Extraction.id) < after)
+        elif offset is not None:
             query = query.offset(offset)
         if limit is not None:
             query = query.limit(limit)
@@ -1076,16 +1171,13 @@ class ExtractionService:
 
     async def get_extraction_with_document(self, extraction_id: uuid.UUID) -> Optional[Extraction]:
         """Get extraction with document relationship loaded"""
+        # Many-to-one, so the document is joined into the same SELECT
         result = await self.session.execute(
-            select(Extraction).where(Extraction.id == extraction_id)
+            select(Extraction)
+            .options(joinedload(Extraction.document))
+            .where(Extraction.id == extraction_id)
         )
-        extraction = result.scalar_one_or_none()
-        
-        if extraction:
-            # Load the document relationship
-            await self.session.refresh(extraction, attribute_names=['document'])
-        
-        return extraction
+        return result.scalar_one_or_none()
 
     async def update_extraction_template(self, extraction_id: uuid.UUID, template_id: uuid.UUID) -> Optional[Extraction]:
         """
@@ -1098,20 +1190,18 @@ class ExtractionService:
         Returns:
             Updated Extraction record or None if not found
         """
-        # Get the extraction record
-        extraction = await self.get_extraction_by_id(extraction_id)
-        
-        if not extraction:
-            return None
-        
-        # Update the template_id and current_step
-        extraction.template_id = template_id
-        extraction.current_step = "template_selected"
-        # updated_at will be automatically updated due to onupdate=datetime.utcnow
+        # Update the template_id and current_step and read the row back in one statement;
+        # updated_at is set by the database through onupdate=func.now()
+        result = await self.session.execute(
+            update(Extraction)
+            .where(Extraction.id == extraction_id)
+            .values(template_id=template_id, current_step="template_selected")
+            .returning(Extraction)
+        )
+        extraction = result.scalar_one_or_none()
         
         # Commit the changes
         await self.session.commit()
-        await self.session.refresh(extraction)
         
         return extraction
 
@@ -1124,13 +1214,33 @@ class ExtractionService:
             
         Returns:
             Mapping results
+            
+        Raises:
+            ValueError: If the extraction does not exist or has no template
+            ExtractionNotReadyError: If Mistral has not finished extracting the document
         """
-        # Get extraction by ID
-        extraction = await self.get_extraction_by_id(extraction_id)
+        # Get only the extraction columns mapping reads, without hydrating an Extraction
+        result = await self.session.execute(
+            select(
+                Extraction.document_id,
+                Extraction.template_id,
+                Extraction.cluster,
+                Extraction.customer,
+                Extraction.status
+            ).where(Extraction.id == extraction_id)
+        )
+        extraction = result.one_or_none()
         
         if not extraction:
             raise ValueError(f"Extraction {extraction_id} not found")
         
+        # Mistral runs after the upload responds; until it has written the markdown there is
+        # nothing to map, and mapping the raw upload would store a garbage TargetMapping
+        if extraction.status not in MAPPABLE_STATUSES:
+            raise ExtractionNotReadyError(
+                f"Extraction {extraction_id} is '{extraction.status}' and cannot be mapped until it is extracted"
+            )
+        
         # Check if template_id is set
         if not extraction.template_id:
             raise ValueError(f"Extraction {extraction_id} has no template assigned")
@@ -1146,18 +1256,18 @@ class ExtractionService:
         # Call function in prompt_utils.py with document_id, template_id, session, cluster, and customer
         target_mapping = await process_content_mapping(document_id, template_id, self.session, cluster, customer)
         
-        # Save the target mapping to the database
+        # Save the target mapping to the database; the INSERT returns its server-set timestamps
         self.session.add(target_mapping)
-        await self.session.flush()  # Get the ID without committing
+        await self.session.flush()
         
         # Update the extraction record with target_mapping_id and current_step
-        extraction.target_mapping_id = target_mapping.id
-        extraction.current_step = "target_mapped"
-        extraction.status = "mapped"
+        await self.session.execute(
+            update(Extraction)
+            .where(Extraction.id == extraction_id)
+            .values(target_mapping_id=target_mapping.id, current_step="target_mapped", status="mapped")
+        )
         
-        # Commit all changes
+        # Commit both writes together; nothing needs refreshing afterwards
         await self.session.commit()
-        await self.session.refresh(extraction)
-        await self.session.refresh(target_mapping)
         
         return target_mapping 
\ No newline at end of file
@@ -1,7 +1,8 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlmodel import select as sqlmodel_select
 
 from apps.dociq.models.template import Template
@@ -9,6 +10,9 @@ from apps.dociq.schemas.template import TemplateCreate, TemplateUpdate
 
 
 class TemplateService:
+    # One instance per request holding only the session, so skip the per-instance __dict__
+    __slots__ = ("session",)
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
@@ -32,17 +36,27 @@ class TemplateService:
         skip: int = 0, 
         limit: int = 100,
         category: Optional[str] = None,
-        template_type: Optional[str] = None
+        template_type: Optional[str] = None,
+        after: Optional[Tuple[datetime, UUID]] = None
     ) -> List[Template]:
-        """Get templates with optional filtering"""
-        query = select(Template)
+        """
+        Get templates with optional filtering, newest first
+        
+        after is the (created_at, id) of the last template on the previous page; when
+        given it seeks through templates_created_at_id_idx and skip is ignored.
+        """
+        query = select(Template).order_by(Template.created_at.desc(), Template.id.desc())
         
         if category:
             query = query.where(Template.category == category)
         if template_type:
             query = query.where(Template.type == template_type)
-            
-        query = query.offset(skip).limit(limit)
+        
+        if after is not None:
+            query = query.where(tuple_(Template.created_at, Template.id) < after)
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         result = await self.session.execute(query)
         return result.scalars().all()
 
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from apps.dociq.db import AsyncSessionLocal as DociqSessionLocal
+from apps.dociq.db import AsyncSessionLocal as DociqSessionLocal, get_dociq_session
 
 # Import models so SQLAlchemy can discover them
 from apps.ocap.models.technical_data import OCAPTechnicalData
@@ -7,13 +7,8 @@ from apps.ocap.models.technical_data import OCAPTechnicalData
 # Reuse dociq's database connection - same database, different tables
 AsyncSessionLocal = DociqSessionLocal
 
-async def get_ocap_session() -> AsyncSession:
-    """Get OCAP database session - reuses dociq's database connection."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+# Reuse dociq's session dependency too, so a request shares one session across apps
+get_ocap_session = get_dociq_session
 
 async def init_ocap_db():
     """Initialize OCAP database (create tables if needed)."""
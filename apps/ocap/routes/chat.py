@@ -1,13 +1,17 @@
 import json
 import asyncio
+import logging
 from datetime import datetime
 from typing import Dict, Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import ORJSONResponse
 from ..services.manufacturing_assistant import ManufacturingTechnicalAssistant
 from ..models.technical_models import WebSocketMessage
 from ..config import get_ocap_settings
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # Get OCAP settings
 settings = get_ocap_settings()
@@ -32,14 +36,11 @@ async def manufacturing_chat_websocket(websocket: WebSocket):
     
     # Initialize manufacturing assistant for this connection
     try:
-        print(f"🔧 Initializing assistant for connection {connection_id}")
+        logger.debug("Initializing assistant for connection %s", connection_id)
         assistant = ManufacturingTechnicalAssistant()
-        print(f"✅ Assistant initialized successfully for {connection_id}")
+        logger.debug("Assistant initialized successfully for %s", connection_id)
     except Exception as e:
-        print(f"❌ Failed to initialize assistant for {connection_id}: {str(e)}")
-        print(f"❌ Error type: {type(e).__name__}")
-        import traceback
-        print(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.exception("Failed to initialize assistant for %s", connection_id)
         await websocket.close(code=1011, reason=f"Failed to initialize assistant: {str(e)}")
         return
     
@@ -70,11 +71,11 @@ async def manufacturing_chat_websocket(websocket: WebSocket):
                 message_data = json.loads(data)
                 user_message = message_data.get("content", data)
                 
-                print(f"📨 Processing message for {connection_id}: {user_message[:50]}...")
+                logger.debug("Processing message for %s: %.50s...", connection_id, user_message)
                 
                 # Process message through manufacturing assistant
                 response = await assistant.process_user_message(user_message)
-                print(f"📤 Generated response for {connection_id}: {response[:50]}...")
+                logger.debug("Generated response for %s: %.50s...", connection_id, response)
                 
                 # Get conversation summary for metadata
                 summary = assistant.get_conversation_summary()
@@ -111,11 +112,7 @@ async def manufacturing_chat_websocket(websocket: WebSocket):
                 await websocket.send_text(response_message.json())
                 
             except Exception as e:
-                # Enhanced error logging
-                print(f"❌ Error processing message for {connection_id}: {str(e)}")
-                print(f"❌ Error type: {type(e).__name__}")
-                import traceback
-                print(f"❌ Full traceback: {traceback.format_exc()}")
+                logger.exception("Error processing message for %s", connection_id)
                 
                 # Send error message
                 error_message = WebSocketMessage(
@@ -128,9 +125,9 @@ async def manufacturing_chat_websocket(websocket: WebSocket):
                 await websocket.send_text(error_message.json())
             
     except WebSocketDisconnect:
-        print(f"🔌 Client {connection_id} disconnected")
+        logger.debug("Client %s disconnected", connection_id)
     except Exception as e:
-        print(f"❌ WebSocket error for {connection_id}: {e}")
+        logger.exception("WebSocket error for %s", connection_id)
         # Send error message if connection is still active
         try:
             error_message = WebSocketMessage(
@@ -152,7 +149,7 @@ async def manufacturing_chat_websocket(websocket: WebSocket):
         except:
             pass
         
-        print(f"🧹 Cleaned up connection {connection_id}")
+        logger.debug("Cleaned up connection %s", connection_id)
 
 @router.get("/ocap-chat/active-connections")
 async def get_active_connections():
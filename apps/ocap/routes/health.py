@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
 import json
@@ -40,7 +41,9 @@ async def health_check():
     try:
         from common.utils.llm_connections import ask_llm_with_system_prompt
         
-        test_response = ask_llm_with_system_prompt(
+        # The Azure client call is synchronous, so it runs off the event loop
+        test_response = await asyncio.to_thread(
+            ask_llm_with_system_prompt,
             system_prompt="You are a test assistant. Respond with exactly: 'HEALTH_CHECK_OK'",
             user_prompt="Health check",
             temperature=0.1
@@ -81,7 +84,7 @@ async def health_check():
         )
         
         chain = template | llm | StrOutputParser()
-        result = chain.invoke({"test": "health check"})
+        result = await chain.ainvoke({"test": "health check"})
         
         health_status["checks"]["langchain"] = {
             "status": "healthy" if "LANGCHAIN_OK" in result else "unhealthy",
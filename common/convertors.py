@@ -0,0 +1,22 @@
+import uuid
+from starlette.convertors import Convertor, register_url_convertor
+
+
+class AnyCaseUUIDConvertor(Convertor):
+    """
+    UUID path convertor matching upper- and lowercase hex, with or without hyphens
+
+    Starlette's built-in "uuid" convertor only matches lowercase hyphenated UUIDs, while
+    IDs in these paths were accepted in either case (and without hyphens) when pydantic
+    validated them. Routes declare it as {name:anyuuid}.
+    """
+    regex = "[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}"
+
+    def convert(self, value: str) -> uuid.UUID:
+        return uuid.UUID(value)
+
+    def to_string(self, value: uuid.UUID) -> str:
+        return str(value)
+
+
+register_url_convertor("anyuuid", AnyCaseUUIDConvertor())
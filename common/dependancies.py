@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+from fastapi import HTTPException, Query, status
+
+
+def keyset_cursor(
+    after: Optional[str] = Query(None, description="Cursor '<created_at>,<id>' of the last record on the previous page")
+) -> Optional[Tuple[datetime, UUID]]:
+    """
+    Parse a keyset pagination cursor built from the created_at and id of the last record
+    already received. Raises HTTPException 400 if the cursor is malformed.
+
+    created_at is copied from responses, so a trailing 'Z' is accepted, and a '+' UTC
+    offset sent without URL-encoding (which arrives decoded as a space) is restored.
+    """
+    if not after:
+        return None
+    try:
+        created_at, _, cursor_id = after.rpartition(",")
+        date_part, separator, time_part = created_at.partition("T" if "T" in created_at else " ")
+        created_at = date_part + separator + time_part.replace(" ", "+")
+        if created_at.endswith("Z"):
+            created_at = created_at[:-1] + "+00:00"
+        return datetime.fromisoformat(created_at), UUID(cursor_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor: expected '<created_at>,<id>'"
+        )
@@ -0,0 +1,67 @@
+from fastapi.responses import ORJSONResponse
+
+
+class _BodyTooLarge(Exception):
+    """Raised from receive once a streamed request body goes over the limit"""
+
+
+# Pure ASGI middleware so it can watch the body stream before anything buffers it
+class MaxBodySizeMiddleware:
+    """
+    Answer 413 to requests whose body is larger than max_body_size
+
+    Declared oversized bodies are refused before a single byte is read. Chunked bodies
+    without Content-Length are counted as they stream in; once over the limit the body
+    parser sees an error, and whatever response the app would build from that is
+    replaced by the 413, as long as no response has started yet.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._too_large(scope, receive, send)
+            return
+
+        received = 0
+        too_large = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    too_large = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            # Body parsers turn the cut-off body into a 400 or 500; drop it for the 413
+            if too_large and not response_started:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not too_large or response_started:
+                raise
+
+        if too_large and not response_started:
+            await self._too_large(scope, receive, send)
+
+    async def _too_large(self, scope, receive, send) -> None:
+        response = ORJSONResponse({"detail": "File too large"}, status_code=413)
+        await response(scope, receive, send)
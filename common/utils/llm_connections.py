@@ -1,10 +1,13 @@
 """
 LLM connections for Azure OpenAI integration
 """
+import logging
 import os
-from openai import AzureOpenAI
+from openai import AzureOpenAI, AsyncAzureOpenAI
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -33,6 +36,13 @@ client = AzureOpenAI(
     azure_endpoint=required_vars["AZURE_OPENAI_ENDPOINT"]
 )
 
+# Shared async client so coroutines can await completions without blocking the event loop
+async_client = AsyncAzureOpenAI(
+    api_key=required_vars["AZURE_OPENAI_API_KEY"],
+    api_version=required_vars["AZURE_OPENAI_API_VERSION"],
+    azure_endpoint=required_vars["AZURE_OPENAI_ENDPOINT"]
+)
+
 def ask_llm(prompt):
     try:
         completion = client.chat.completions.create(
@@ -43,8 +53,34 @@ def ask_llm(prompt):
         return completion.choices[0].message.content
     except Exception as e:
         error_msg = f"Error calling Azure OpenAI: {str(e)}"
-        print(error_msg)  # For logging
-        raise Exception(error_msg)
+        logger.error(error_msg)
+        raise Exception(error_msg) from e
+
+
+async def ask_llm_async(prompt: str) -> str:
+    """
+    Async variant of ask_llm for use inside coroutines
+    
+    Args:
+        prompt: The user prompt to send
+        
+    Returns:
+        The LLM's response as a string
+        
+    Raises:
+        Exception: If there's an error calling Azure OpenAI
+    """
+    try:
+        completion = await async_client.chat.completions.create(
+            model=required_vars["AZURE_OPENAI_DEPLOYMENT"],
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3  # Lower temperature for more focused responses
+        )
+        return completion.choices[0].message.content
+    except Exception as e:
+        error_msg = f"Error calling Azure OpenAI: {str(e)}"
+        logger.error(error_msg)
+        raise Exception(error_msg) from e
 
 
 def ask_llm_with_system_prompt(system_prompt: str, user_prompt: str, temperature: float = 0.3, max_tokens: int = None) -> str:
@@ -85,8 +121,8 @@ def ask_llm_with_system_prompt(system_prompt: str, user_prompt: str, temperature
         
     except Exception as e:
         error_msg = f"Error calling Azure OpenAI: {str(e)}"
-        print(error_msg)  # For logging
-        raise Exception(error_msg)
+        logger.error(error_msg)
+        raise Exception(error_msg) from e
 
 
 def is_llm_available() -> bool:
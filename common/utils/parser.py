@@ -18,6 +18,9 @@ from mistralai import Mistral
 # Initialize Mistral client
 client = Mistral(api_key=os.getenv("MISTRAL_API_KEY"))
 
+# OCR model used for every document; also part of cached extraction keys
+MISTRAL_OCR_MODEL = "mistral-ocr-latest"
+
 
 def parse_with_mistral(file: UploadFile) -> str:
     """
@@ -81,7 +84,7 @@ def parse_with_mistral(file: UploadFile) -> str:
 
         # Use Mistral OCR API
         ocr_response = client.ocr.process(
-            model="mistral-ocr-latest",
+            model=MISTRAL_OCR_MODEL,
             document=document
         )
 
@@ -206,7 +209,7 @@ def parse_with_mistral_content_only(file: UploadFile) -> str:
 
         # Use Mistral OCR API
         ocr_response = client.ocr.process(
-            model="mistral-ocr-latest",
+            model=MISTRAL_OCR_MODEL,
             document=document
         )
 
@@ -9,10 +9,7 @@ from core.auth.models import Tenant, User, UserSession
 async def get_auth_session() -> AsyncSession:
     """Get auth database session - reuses dociq's database connection."""
     async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
 
 async def init_auth_db():
@@ -5,20 +5,16 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.auth.models import User, Tenant, UserRole
 from core.auth.services import AuthService
-from apps.dociq.db import AsyncSessionLocal
+from apps.dociq.db import get_dociq_session
 
 
 # OAuth2 scheme for JWT tokens
 security = HTTPBearer(auto_error=False)
 
 
-async def get_auth_db_session() -> AsyncSession:
-    """Get database session for auth operations."""
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+# Auth uses the same database as dociq; sharing the dependency lets FastAPI resolve
+# one session (and one pooled connection) per request when a route needs both
+get_auth_db_session = get_dociq_session
 
 
 async def get_auth_service(
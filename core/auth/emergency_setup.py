@@ -4,21 +4,22 @@ These routes can be used to manually create the initial admin user.
 """
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from core.auth.services import AuthService
 from core.auth.schemas import UserRegisterSchema, TenantCreateSchema
 from core.auth.models import UserRole
-from core.auth.dependencies import get_auth_db_session
+from core.auth.dependencies import get_auth_service
 from core.auth.config import get_auth_settings
 
-router = APIRouter()
+router = APIRouter(tags=["Emergency Setup"], default_response_class=ORJSONResponse)
 
 
 @router.post("/emergency-setup-tenant", 
              summary="Emergency: Create default tenant",
              description="Creates the default tenant if it doesn't exist. Use only if initial setup failed.")
 async def emergency_create_tenant(
-    auth_service: AuthService = Depends(lambda db=Depends(get_auth_db_session): AuthService(db))
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Emergency route to create default tenant."""
     try:
@@ -52,7 +53,7 @@ async def emergency_create_tenant(
              summary="Emergency: Create super admin user", 
              description="Creates the super admin user if it doesn't exist. Use only if initial setup failed.")
 async def emergency_create_admin(
-    auth_service: AuthService = Depends(lambda db=Depends(get_auth_db_session): AuthService(db))
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Emergency route to create super admin user."""
     try:
@@ -105,7 +106,7 @@ async def emergency_create_admin(
             summary="Check emergency setup status",
             description="Check if tenant and admin user exist")
 async def emergency_status(
-    auth_service: AuthService = Depends(lambda db=Depends(get_auth_db_session): AuthService(db))
+    auth_service: AuthService = Depends(get_auth_service)
 ):
     """Check the status of tenant and admin user."""
     try:
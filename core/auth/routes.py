@@ -1,6 +1,7 @@
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
 from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import ORJSONResponse
 
 from core.auth.models import User, Tenant, UserRole
 from core.auth.schemas import (
@@ -29,7 +30,7 @@ from core.auth.dependencies import (
 )
 
 
-router = APIRouter()
+router = APIRouter(tags=["Authentication"], default_response_class=ORJSONResponse)
 
 
 @router.post("/register", 
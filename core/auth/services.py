@@ -20,6 +20,8 @@ from core.auth.utils import PasswordUtils, JWTUtils, TenantUtils
 class AuthService:
     """Service class for authentication operations."""
     
+    __slots__ = ("db",)
+    
     def __init__(self, db_session: AsyncSession):
         self.db = db_session
     
@@ -1,25 +1,61 @@
 # main.py
+import asyncio
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import RedirectResponse
-from api.router import router as api_router  # << use this, not api.v1.router
-from apps.dociq.db import init_dociq_db
+from api.router import mount_api  # << use this, not api.v1.router
+from apps.dociq.db import init_dociq_db, ensure_indexes
 from apps.dociq.config import get_dociq_settings
+from apps.dociq.redis_client import init_redis_connection, close_redis_connection
+from apps.dociq.services.extraction_service import listen_for_table_cache_invalidation, load_reference_tables, recover_interrupted_extractions
 from core.auth.db import setup_initial_data
+from common.middleware import MaxBodySizeMiddleware
 
-app = FastAPI(title="Consolidator AI API", version="1.0.0")
+app = FastAPI(
+    title="Consolidator AI API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # Get settings
 settings = get_dociq_settings()
 
+# Every logger hands records to a queue on the root logger; a listener thread does the
+# stream I/O so logging never blocks the event loop. The application packages log at
+# LOG_LEVEL, everything else at the root's WARNING
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+logging.getLogger().addHandler(QueueHandler(_log_queue))
+for _package in ("apps", "common", "core", "api"):
+    logging.getLogger(_package).setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+# Background subscriber that keeps in-process reference table caches in step across workers
+_table_cache_listener = None
+
+# Background task building indexes, so startup does not wait on it
+_index_builder = None
+
+# Background task failing extractions whose Mistral task was lost to a restart
+_extraction_recovery = None
+
 # Add trusted host middleware for security
 app.add_middleware(
     TrustedHostMiddleware,
     allowed_hosts=["*"]  # Configure this properly for production
 )
 
+# Add request body size limit; added before CORS so its 413 responses get CORS headers
+app.add_middleware(MaxBodySizeMiddleware, max_body_size=settings.MAX_UPLOAD_MB * 1024 * 1024)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -73,7 +109,14 @@ app.add_middleware(SecurityHeadersMiddleware)
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
+    global _table_cache_listener, _index_builder, _extraction_recovery
+    _log_listener.start()
     await init_dociq_db()
+    _extraction_recovery = asyncio.create_task(recover_interrupted_extractions())
+    _index_builder = asyncio.create_task(ensure_indexes())
+    await load_reference_tables()
+    if await init_redis_connection():
+        _table_cache_listener = asyncio.create_task(listen_for_table_cache_invalidation())
     # Setup initial auth data (default tenant and super admin)
     try:
         result = await setup_initial_data()
@@ -83,5 +126,21 @@ async def startup_event():
         print(f"Critical error during auth setup: {e}")
         # Don't crash the entire app for auth setup issues
         print("Application will continue without auth setup. You can create users manually via API.")
+    # Build and cache the OpenAPI schema now rather than on the first /openapi.json request
+    app.openapi()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections on shutdown"""
+    # A cancelled index build is left INVALID and rebuilt on the next startup
+    for task in (_table_cache_listener, _index_builder, _extraction_recovery):
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    await close_redis_connection()
+    _log_listener.stop()
 
-app.include_router(api_router) 
\ No newline at end of file
+mount_api(app) 
\ No newline at end of file
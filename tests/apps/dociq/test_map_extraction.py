@@ -0,0 +1,73 @@
+"""
+Test cases for mapping an extraction before its document has been extracted
+"""
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from apps.dociq.routes.extraction import map_extraction as map_extraction_route
+from apps.dociq.services.extraction_service import ExtractionService, ExtractionNotReadyError
+
+
+def _service_with_extraction(extraction_status):
+    """Build an ExtractionService whose session returns one extraction row with the given status"""
+    row = SimpleNamespace(
+        document_id=uuid.uuid4(),
+        template_id=uuid.uuid4(),
+        cluster="cluster",
+        customer="customer",
+        status=extraction_status,
+    )
+    result = MagicMock()
+    result.one_or_none.return_value = row
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    session.flush = AsyncMock()
+    session.commit = AsyncMock()
+    return ExtractionService(session)
+
+
+class TestMapExtraction:
+    """Test cases for ExtractionService.map_extraction status checks"""
+
+    @pytest.mark.parametrize("extraction_status", ["queued", "processing", "extraction_failed"])
+    def test_map_extraction_not_extracted(self, extraction_status):
+        """Test that mapping is refused until Mistral has extracted the document"""
+        service = _service_with_extraction(extraction_status)
+
+        with patch('apps.dociq.services.extraction_service.process_content_mapping', new_callable=AsyncMock) as mock_mapping:
+            with pytest.raises(ExtractionNotReadyError):
+                asyncio.run(service.map_extraction(uuid.uuid4()))
+
+            # Nothing is sent to the LLM or written
+            mock_mapping.assert_not_called()
+            service.session.commit.assert_not_called()
+
+    @pytest.mark.parametrize("extraction_status", ["extracted", "mapped"])
+    def test_map_extraction_extracted(self, extraction_status):
+        """Test that extracted (and already mapped) extractions are mapped"""
+        service = _service_with_extraction(extraction_status)
+        target_mapping = MagicMock()
+
+        with patch('apps.dociq.services.extraction_service.process_content_mapping', new_callable=AsyncMock) as mock_mapping:
+            mock_mapping.return_value = target_mapping
+
+            result = asyncio.run(service.map_extraction(uuid.uuid4()))
+
+            assert result is target_mapping
+            mock_mapping.assert_awaited_once()
+            service.session.commit.assert_awaited_once()
+
+    def test_map_extraction_route_returns_409(self):
+        """Test that the map route answers 409 Conflict for an extraction still being processed"""
+        service = _service_with_extraction("queued")
+
+        with patch('apps.dociq.services.extraction_service.process_content_mapping', new_callable=AsyncMock):
+            with pytest.raises(HTTPException) as exc_info:
+                asyncio.run(map_extraction_route(uuid.uuid4(), extraction_service=service))
+
+        assert exc_info.value.status_code == 409
@@ -0,0 +1,177 @@
+"""
+Test cases for the TargetMapping running confidence totals and field index
+"""
+import pytest
+
+from apps.dociq.models.target_mapping import TargetMapping
+
+
+def _entry(target_field, target_confidence, target_value="value"):
+    return {
+        "target_field": target_field,
+        "target_value": target_value,
+        "target_confidence": target_confidence
+    }
+
+
+class TestTargetMappingAdd:
+    """Test cases for add_target_mapping"""
+
+    def test_add_updates_totals(self):
+        """Test that each add keeps overall and average confidence current"""
+        target_mapping = TargetMapping(target_mappings=[])
+
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        assert target_mapping.overall_confidence == pytest.approx(0.5)
+
+        target_mapping.add_target_mapping("size", "M", 0.25)
+        assert target_mapping.overall_confidence == pytest.approx(0.75)
+        assert target_mapping.calculate_overall_confidence() == pytest.approx(0.75)
+        assert target_mapping.average_confidence == pytest.approx(0.375)
+        assert target_mapping.mapping_count == 2
+
+    def test_add_indexes_fields(self):
+        """Test that added entries are found by field, the first one winning for duplicates"""
+        target_mapping = TargetMapping(target_mappings=[])
+
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        target_mapping.add_target_mapping("color", "Blue", 0.9)
+
+        assert target_mapping.get_mapping_by_field("color")["target_value"] == "Red"
+        assert target_mapping.get_mapping_by_field("missing") is None
+
+    def test_add_to_loaded_mappings(self):
+        """Test adding to a mapping created with existing entries"""
+        target_mapping = TargetMapping(target_mappings=[_entry("color", 0.5), _entry("size", None)])
+
+        target_mapping.add_target_mapping("fabric", "Cotton", 0.25)
+
+        assert target_mapping.overall_confidence == pytest.approx(0.75)
+        assert target_mapping.average_confidence == pytest.approx(0.375)
+        assert target_mapping.get_mapping_by_field("size")["target_confidence"] is None
+        assert target_mapping.get_mapping_by_field("fabric")["target_value"] == "Cotton"
+
+
+class TestTargetMappingNoneConfidence:
+    """Test cases for entries without a confidence"""
+
+    def test_none_confidences_are_not_counted(self):
+        """Test that None confidences add nothing and do not count towards the average"""
+        target_mapping = TargetMapping(target_mappings=[])
+
+        target_mapping.add_target_mapping("color", "Red", None)
+        assert target_mapping.overall_confidence == 0.0
+        assert target_mapping.average_confidence == 0.0
+
+        target_mapping.add_target_mapping("size", "M", 0.4)
+        target_mapping.add_target_mapping("fabric", "Cotton", None)
+
+        assert target_mapping.overall_confidence == pytest.approx(0.4)
+        assert target_mapping.average_confidence == pytest.approx(0.4)
+        assert target_mapping.mapping_count == 3
+
+    def test_no_confidences(self):
+        """Test totals of a mapping whose entries all lack a confidence"""
+        target_mapping = TargetMapping(target_mappings=[_entry("color", None), _entry("size", None)])
+
+        assert target_mapping.calculate_overall_confidence() == 0.0
+        assert target_mapping.average_confidence == 0.0
+
+
+class TestTargetMappingUpdateConfidence:
+    """Test cases for update_mapping_confidence"""
+
+    def test_update_existing_confidence(self):
+        """Test replacing one entry's confidence"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        target_mapping.add_target_mapping("size", "M", 0.25)
+
+        assert target_mapping.update_mapping_confidence("color", 0.9) is True
+
+        assert target_mapping.get_mapping_by_field("color")["target_confidence"] == 0.9
+        assert target_mapping.overall_confidence == pytest.approx(1.15)
+        assert target_mapping.average_confidence == pytest.approx(0.575)
+
+    def test_update_to_and_from_none(self):
+        """Test that clearing a confidence and setting it again adjust the count of valid entries"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        target_mapping.add_target_mapping("size", "M", 0.25)
+
+        target_mapping.update_mapping_confidence("color", None)
+        assert target_mapping.overall_confidence == pytest.approx(0.25)
+        assert target_mapping.average_confidence == pytest.approx(0.25)
+
+        target_mapping.update_mapping_confidence("color", 0.75)
+        assert target_mapping.overall_confidence == pytest.approx(1.0)
+        assert target_mapping.average_confidence == pytest.approx(0.5)
+
+    def test_update_missing_field(self):
+        """Test that updating an unknown field changes nothing"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+
+        assert target_mapping.update_mapping_confidence("missing", 0.9) is False
+        assert target_mapping.overall_confidence == pytest.approx(0.5)
+
+
+class TestTargetMappingCacheInvalidation:
+    """Test cases for changes made to target_mappings outside the model's methods"""
+
+    def test_replacing_the_list(self):
+        """Test that assigning a new list, even of the same length, rebuilds totals and index"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        assert target_mapping.get_mapping_by_field("color")["target_value"] == "Red"
+
+        target_mapping.target_mappings = [_entry("size", 0.2, "L")]
+
+        assert target_mapping.calculate_overall_confidence() == pytest.approx(0.2)
+        assert target_mapping.get_mapping_by_field("color") is None
+        assert target_mapping.get_mapping_by_field("size")["target_value"] == "L"
+
+        target_mapping.add_target_mapping("fabric", "Cotton", 0.3)
+        assert target_mapping.overall_confidence == pytest.approx(0.5)
+
+    def test_appending_directly(self):
+        """Test that entries appended to the list directly are picked up by its length change"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+
+        target_mapping.target_mappings.append(_entry("size", 0.25))
+
+        assert target_mapping.calculate_overall_confidence() == pytest.approx(0.75)
+        assert target_mapping.get_mapping_by_field("size") is not None
+
+    def test_in_place_confidence_edit(self):
+        """Test that update_overall_confidence picks up confidences edited in place"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        target_mapping.add_target_mapping("size", "M", 0.25)
+
+        target_mapping.target_mappings[0]["target_confidence"] = 0.1
+        target_mapping.target_mappings[1]["target_confidence"] = None
+        target_mapping.update_overall_confidence()
+
+        assert target_mapping.overall_confidence == pytest.approx(0.1)
+        assert target_mapping.average_confidence == pytest.approx(0.1)
+
+        # The running totals continue from the recomputed values
+        target_mapping.update_mapping_confidence("size", 0.4)
+        assert target_mapping.overall_confidence == pytest.approx(0.5)
+
+    def test_in_place_entry_replacement(self):
+        """Test that update_overall_confidence picks up entries replaced in place"""
+        target_mapping = TargetMapping(target_mappings=[])
+        target_mapping.add_target_mapping("color", "Red", 0.5)
+        target_mapping.get_mapping_by_field("color")
+
+        target_mapping.target_mappings[0] = _entry("size", 0.3, "L")
+        target_mapping.update_overall_confidence()
+
+        assert target_mapping.overall_confidence == pytest.approx(0.3)
+        assert target_mapping.get_mapping_by_field("color") is None
+        assert target_mapping.update_mapping_confidence("size", 0.6) is True
+        assert target_mapping.target_mappings[0]["target_confidence"] == 0.6
+        assert target_mapping.overall_confidence == pytest.approx(0.6)
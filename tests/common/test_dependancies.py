@@ -0,0 +1,106 @@
+"""
+Test cases for the keyset pagination cursor dependency
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from common.dependancies import keyset_cursor
+
+
+CURSOR_ID = uuid.UUID("8f1c2d3e-4b5a-4c6d-8e7f-901234567890")
+
+
+class TestKeysetCursor:
+    """Test cases for keyset_cursor parsing"""
+
+    def test_no_cursor(self):
+        """Test that a missing or empty cursor means the first page"""
+        assert keyset_cursor(None) is None
+        assert keyset_cursor("") is None
+
+    def test_naive_timestamp(self):
+        """Test parsing a cursor without a UTC offset"""
+        created_at, cursor_id = keyset_cursor(f"2024-01-01T10:00:00.123456,{CURSOR_ID}")
+
+        assert created_at == datetime(2024, 1, 1, 10, 0, 0, 123456)
+        assert cursor_id == CURSOR_ID
+
+    def test_offset_timestamp(self):
+        """Test parsing a cursor with a '+' UTC offset"""
+        created_at, cursor_id = keyset_cursor(f"2024-01-01T10:00:00+05:30,{CURSOR_ID}")
+
+        assert created_at == datetime(2024, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+        assert cursor_id == CURSOR_ID
+
+    def test_offset_decoded_as_space(self):
+        """Test that a '+' offset sent unencoded, and so decoded as a space, is restored"""
+        created_at, _ = keyset_cursor(f"2024-01-01T10:00:00 05:30,{CURSOR_ID}")
+
+        assert created_at == datetime(2024, 1, 1, 10, 0, tzinfo=timezone(timedelta(hours=5, minutes=30)))
+
+    def test_space_separated_timestamp(self):
+        """Test that a space between date and time is kept as the separator"""
+        created_at, _ = keyset_cursor(f"2024-01-01 10:00:00 00:00,{CURSOR_ID}")
+
+        assert created_at == datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+    def test_utc_z_suffix(self):
+        """Test parsing a cursor whose timestamp ends in 'Z'"""
+        created_at, _ = keyset_cursor(f"2024-01-01T10:00:00Z,{CURSOR_ID}")
+
+        assert created_at == datetime(2024, 1, 1, 10, 0, tzinfo=timezone.utc)
+
+    @pytest.mark.parametrize("after", [
+        "not-a-cursor",
+        f"{CURSOR_ID}",
+        "2024-01-01T10:00:00,not-a-uuid",
+        f"yesterday,{CURSOR_ID}",
+        f",{CURSOR_ID}",
+        "2024-01-01T10:00:00,",
+    ])
+    def test_malformed_cursor(self, after):
+        """Test that malformed cursors are rejected with 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            keyset_cursor(after)
+
+        assert exc_info.value.status_code == 400
+
+
+class TestKeysetCursorQuery:
+    """Test cases for keyset_cursor as a query parameter dependency"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get("/items")
+        def items(cursor=Depends(keyset_cursor)):
+            if cursor is None:
+                return {"cursor": None}
+            return {"created_at": cursor[0].isoformat(), "id": str(cursor[1])}
+
+        return TestClient(app)
+
+    def test_unencoded_plus_in_query(self, client):
+        """Test a cursor whose '+' offset was put in the URL without encoding"""
+        response = client.get(f"/items?after=2024-01-01T10:00:00+00:00,{CURSOR_ID}")
+
+        assert response.status_code == 200
+        assert response.json() == {"created_at": "2024-01-01T10:00:00+00:00", "id": str(CURSOR_ID)}
+
+    def test_encoded_plus_in_query(self, client):
+        """Test a cursor passed as a properly encoded query parameter"""
+        response = client.get("/items", params={"after": f"2024-01-01T10:00:00+00:00,{CURSOR_ID}"})
+
+        assert response.status_code == 200
+        assert response.json()["created_at"] == "2024-01-01T10:00:00+00:00"
+
+    def test_malformed_cursor_in_query(self, client):
+        """Test that a malformed cursor in the query string answers 400"""
+        response = client.get("/items", params={"after": "garbage"})
+
+        assert response.status_code == 400
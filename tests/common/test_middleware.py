@@ -0,0 +1,106 @@
+"""
+Test cases for the request body size limit middleware
+"""
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from common.middleware import MaxBodySizeMiddleware
+
+
+MAX_BODY_SIZE = 1024
+ORIGIN = "https://client.example.com"
+
+
+class Payload(BaseModel):
+    data: str
+
+
+def _chunks(body: bytes, chunk_size: int = 256):
+    """Yield the body in pieces so it is sent chunked, without Content-Length"""
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.post("/json")
+    async def post_json(payload: Payload):
+        return {"size": len(payload.data)}
+
+    @app.post("/upload")
+    async def post_upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    # Added before CORS as in main.py, so 413 responses carry CORS headers
+    app.add_middleware(MaxBodySizeMiddleware, max_body_size=MAX_BODY_SIZE)
+    app.add_middleware(CORSMiddleware, allow_origins=[ORIGIN])
+
+    return TestClient(app)
+
+
+class TestMaxBodySizeMiddleware:
+    """Test cases for MaxBodySizeMiddleware"""
+
+    def test_small_body_passes(self, client):
+        """Test that bodies under the limit reach the route"""
+        response = client.post("/json", json={"data": "x" * 10})
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 10}
+
+    def test_small_chunked_body_passes(self, client):
+        """Test that chunked bodies under the limit reach the route"""
+        response = client.post(
+            "/json",
+            content=_chunks(b'{"data": "xxxxxxxxxx"}'),
+            headers={"Content-Type": "application/json"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 10}
+
+    def test_content_length_over_limit(self, client):
+        """Test that a declared oversized body is refused with 413"""
+        response = client.post("/json", json={"data": "x" * (MAX_BODY_SIZE * 2)}, headers={"Origin": ORIGIN})
+
+        assert response.status_code == 413
+        assert response.json() == {"detail": "File too large"}
+        assert response.headers["access-control-allow-origin"] == ORIGIN
+
+    def test_chunked_json_over_limit(self, client):
+        """Test that an oversized chunked JSON body gets 413, not a body parsing error"""
+        body = b'{"data": "' + b"x" * (MAX_BODY_SIZE * 2) + b'"}'
+        response = client.post(
+            "/json",
+            content=_chunks(body),
+            headers={"Content-Type": "application/json", "Origin": ORIGIN}
+        )
+
+        assert "content-length" not in response.request.headers
+        assert response.status_code == 413
+        assert response.json() == {"detail": "File too large"}
+        assert response.headers["access-control-allow-origin"] == ORIGIN
+
+    def test_chunked_multipart_over_limit(self, client):
+        """Test that an oversized chunked multipart upload gets 413, not a body parsing error"""
+        boundary = "testboundary"
+        body = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="document.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode() + b"%PDF-" + b"x" * (MAX_BODY_SIZE * 2) + f"\r\n--{boundary}--\r\n".encode()
+        response = client.post(
+            "/upload",
+            content=_chunks(body),
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}", "Origin": ORIGIN}
+        )
+
+        assert "content-length" not in response.request.headers
+        assert response.status_code == 413
+        assert response.json() == {"detail": "File too large"}
+        assert response.headers["access-control-allow-origin"] == ORIGIN